@@ -3,42 +3,93 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+import threading
 from dash import Dash, html, dcc
 from dash.dependencies import Input, Output
-from estimation_page.estimation_dashboard import estimation_layout
+from estimation_page.estimation_dashboard import estimation_layout, model_artifact
+from estimation_page.prediction_api import register_prediction_api
 from first_page.introduction_description import first_layout
 from second_page.exploratory_data_visualization import second_layout
 from third_page.data_cleaning_imputation_description import third_layout
-from fourth_page.find_best_predictors_description import fourth_layout
-from fifth_page.mlr_description import fifth_layout
+from fourth_page.find_best_predictors_description import build_fourth_layout
+from fifth_page.mlr_description import build_fifth_layout
 
 app = Dash(__name__, 
            suppress_callback_exceptions=True, 
            external_scripts=['https://cdn.plot.ly/plotly-latest.min.js'])
 server = app.server
 
+# JSON prediction route for machine clients (POST /api/predict)
+register_prediction_api(server, model_artifact)
+
 app.layout = html.Div([
     dcc.Location(id='url', refresh=False),
     html.Div(id='page-content')
 ])
 
+
+class PageRegistry:
+    """
+    Page layouts by pathname, each built on first request and then cached.
+
+    Every page module is still imported above, so its callbacks are registered
+    before the server starts (Dash ignores callbacks added after the first
+    request); only the model fits and figures behind the fourth and fifth pages
+    are deferred to their builders.
+
+    Parameters:
+    ----------
+    builders : dict
+        Pathname to a function returning the page layout.
+    default : str
+        Pathname served for unknown paths.
+    """
+
+    def __init__(self, builders, default):
+        self.builders = builders
+        self.default = default
+        self.layouts = {}
+        self.locks = {pathname: threading.Lock() for pathname in builders}
+
+    def get(self, pathname):
+        if pathname not in self.builders:
+            pathname = self.default
+
+        layout = self.layouts.get(pathname)
+        if layout is None:
+            # One build per page, even when several requests arrive before it finishes
+            with self.locks[pathname]:
+                layout = self.layouts.get(pathname)
+                if layout is None:
+                    layout = self.layouts[pathname] = self.builders[pathname]()
+        return layout
+
+    def warmup(self):
+        """Build every page in a background thread; returns the thread."""
+        thread = threading.Thread(target=lambda: [self.get(pathname) for pathname in self.builders],
+                                  name='page-warmup', daemon=True)
+        thread.start()
+        return thread
+
+
+pages = PageRegistry({
+    '/estimation_page.estimation_dashboard': lambda: estimation_layout,
+    '/first_page.introduction_description': lambda: first_layout,
+    '/second_page.exploratory_data_visualization': lambda: second_layout,
+    '/third_page.data_cleaning_imputation_description': lambda: third_layout,
+    '/fourth_page.find_best_predictors_description': build_fourth_layout,
+    '/fifth_page.mlr_description': build_fifth_layout
+}, default='/estimation_page.estimation_dashboard')
+
+# Build the deferred pages in the background right away (BODYFAT_WARMUP=1), so the
+# first visitor of the fourth or fifth page does not wait for the fits
+if os.environ.get('BODYFAT_WARMUP', '0') == '1':
+    pages.warmup()
+
 @app.callback(Output('page-content', 'children'),
               Input('url', 'pathname'))
 def display_page(pathname):
-    if pathname == '/estimation_page.estimation_dashboard':
-        return estimation_layout
-    elif pathname == '/first_page.introduction_description':
-        return first_layout
-    elif pathname == '/second_page.exploratory_data_visualization':
-        return second_layout
-    elif pathname == '/third_page.data_cleaning_imputation_description':
-        return third_layout
-    elif pathname == '/fourth_page.find_best_predictors_description':
-        return fourth_layout
-    elif pathname == '/fifth_page.mlr_description':
-        return fifth_layout
-    else:
-        return estimation_layout
+    return pages.get(pathname)
 
 if __name__ == '__main__':
     app.run_server(debug=True)
@@ -0,0 +1,101 @@
+// Clientside version of the estimator page's update_prediction callback
+// (estimation_page/estimation_dashboard.py). The model coefficients and the age
+// band thresholds come from the 'model-params' store, so the prediction and the
+// number line are computed in the browser without a server round-trip.
+
+(function () {
+    function classificationRanges(age, params) {
+        for (var i = 0; i < params.age_groups.length; i++) {
+            var group = params.age_groups[i];
+            if (group.min <= age && age <= group.max) {
+                return group.thresholds;
+            }
+        }
+        return null;
+    }
+
+    function predictBodyFat(inputs, params) {
+        var prediction = params.intercept;
+        for (var name in params.coefficients) {
+            prediction += params.coefficients[name] * inputs[name];
+        }
+        return prediction;
+    }
+
+    function numberLineFigure(bodyFat, thresholds, params) {
+        var rangeMin = params.range[0];
+        var rangeMax = params.range[1];
+        var labels = params.labels;
+
+        // Band labels centered between the thresholds
+        var annotations = labels.map(function (label, i) {
+            var xPos;
+            if (i === 0) {
+                xPos = (rangeMin + thresholds[0]) / 2;
+            } else if (i === labels.length - 1) {
+                xPos = (thresholds[thresholds.length - 1] + rangeMax) / 2;
+            } else {
+                xPos = (thresholds[i - 1] + thresholds[i]) / 2;
+            }
+            return {
+                x: xPos, y: 0.7, text: '<b>' + label + '<b>', showarrow: false,
+                font: {size: 10, color: 'black'}
+            };
+        });
+
+        // Bifurcation lines, adjusted slightly to prevent overlap
+        var adjusted = [thresholds[0] - 0.05, thresholds[1] + 0.05, thresholds[2] - 0.05];
+        var shapes = adjusted.map(function (x) {
+            return {type: 'line', x0: x, x1: x, y0: 0, y1: 1, line: {color: 'black', width: 2}, layer: 'below'};
+        });
+        shapes.push({type: 'line', x0: rangeMin, x1: rangeMax, y0: 0.5, y1: 0.5,
+                     line: {color: 'black', width: 2}, layer: 'below'});
+
+        var ticks = [rangeMin].concat(thresholds, [rangeMax]);
+
+        return {
+            data: [{
+                type: 'scatter', x: [bodyFat], y: [0.5], mode: 'markers',
+                marker: {size: 16, color: '#EE6C4D', symbol: 'diamond'},
+                name: 'Your Body Fat'
+            }],
+            layout: {
+                annotations: annotations,
+                xaxis: {
+                    range: [rangeMin, rangeMax], tickmode: 'array', tickvals: ticks,
+                    ticktext: ticks.map(function (t) { return t + '%'; }),
+                    showgrid: true, gridcolor: 'black', gridwidth: 2, layer: 'below traces'
+                },
+                yaxis: {showticklabels: false, showgrid: false, zeroline: false, layer: 'below traces'},
+                height: 200,
+                margin: {l: 10, r: 10, t: 30, b: 30},
+                shapes: shapes,
+                title: {text: '<b>Estimated Bodyfat:<b> ' + bodyFat.toFixed(1) + '%', x: 0.5, y: 0.95},
+                showlegend: false,
+                plot_bgcolor: '#FFFFFF',
+                paper_bgcolor: '#FFFFFF'
+            }
+        };
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        estimator: {
+            update_prediction: function (nClicks, age, abdomen, params) {
+                if (!(nClicks > 0 && age && abdomen) || !params) {
+                    return {};
+                }
+                if (age < params.min_age || abdomen < params.min_abdomen) {
+                    return {};
+                }
+
+                var thresholds = classificationRanges(age, params);
+                if (thresholds === null) {
+                    return {};
+                }
+
+                var bodyFat = predictBodyFat({AGE: age, ABDOMEN: abdomen}, params);
+                return numberLineFigure(bodyFat, thresholds, params);
+            }
+        }
+    });
+})();
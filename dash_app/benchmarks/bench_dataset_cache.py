@@ -0,0 +1,76 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import subprocess
+import tempfile
+import numpy as np
+import pandas as pd
+from model.datasets import build_columnar_cache, dataset_path
+
+# Loads the cohort in a fresh interpreter and reports the load time and the growth
+# of the resident set, so the two modes do not share pages or allocator state
+LOAD_SCRIPT = '''
+import sys, os, json, time
+sys.path.insert(0, {root!r})
+import numpy as np
+import pandas as pd
+from model.datasets import read_columnar
+
+def rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+before = rss()
+start = time.perf_counter()
+df = pd.read_csv({path!r}) if {mode!r} == 'csv' else read_columnar({path!r}, float32={float32}, cache_dir={cache!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'rss_mib': (rss() - before) / 2 ** 20, 'rows': len(df)}}))
+'''
+
+
+def synthetic_cohort(n, path, rng):
+    # Rows of BodyFat.csv resampled with small measurement noise
+    df = pd.read_csv(dataset_path('BodyFat.csv'))
+    cohort = df.iloc[rng.integers(0, len(df), n)].reset_index(drop=True)
+    floats = cohort.select_dtypes('float').columns
+    cohort[floats] = (cohort[floats] * rng.normal(1, 0.01, (n, len(floats)))).round(2)
+    cohort['IDNO'] = np.arange(1, n + 1)
+    cohort.to_csv(path, index=False)
+
+
+def load(mode, path, cache, float32=False):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = LOAD_SCRIPT.format(root=root, path=path, mode=mode, float32=float32, cache=cache)
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load time and memory of the CSV versus the columnar cache.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(123)
+
+    print(f"{'rows':>9} {'mode':>14} {'load (s)':>9} {'RSS (MiB)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, 'cache')
+        for n in args.sizes:
+            path = os.path.join(tmp, f'cohort_{n}.csv')
+            synthetic_cohort(n, path, rng)
+
+            # Convert once up front; the timings below are the warm-start loads
+            build_columnar_cache(path, cache_dir=cache)
+            build_columnar_cache(path, float32=True, cache_dir=cache)
+
+            for mode, label, float32 in [('csv', 'csv', False), ('cache', 'cache float64', False),
+                                         ('cache', 'cache float32', True)]:
+                result = load(mode, path, cache, float32)
+                print(f"{n:>9} {label:>14} {result['seconds']:9.3f} {result['rss_mib']:10.1f}")
+
+
+if __name__ == '__main__':
+    main()
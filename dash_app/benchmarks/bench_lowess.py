@@ -0,0 +1,66 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+import numpy as np
+from model.smoothing import smooth, smooth_many
+
+
+def best_time(func, repeats):
+    # Best-of-n wall clock time and the last result
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def diagnostic_data(n, rng):
+    # Residual-plot-like data: heavy tailed residuals against fitted values and a
+    # right-skewed leverage
+    fitted = rng.normal(19, 7, n)
+    residuals = rng.standard_t(4, n) * 4
+    leverage = rng.exponential(3 / n, n)
+    standardized = residuals / residuals.std()
+    return [(residuals, fitted),
+            (np.sqrt(np.abs(standardized)), fitted),
+            (standardized, leverage)]
+
+
+def max_difference(exact, approx):
+    # Largest gap between the curves, relative to the range of the exact curve
+    gap = np.abs(np.interp(approx[:, 0], exact[:, 0], exact[:, 1]) - approx[:, 1])
+    return gap.max() / max(np.ptp(exact[:, 1]), np.finfo(float).eps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the LOWESS smoothers of the diagnostic plots.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[250, 1_000, 5_000, 20_000, 100_000])
+    parser.add_argument('--lowess-max', type=int, default=20_000,
+                        help="Largest n to run statsmodels' exact lowess on.")
+    parser.add_argument('--repeats', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(123)
+
+    print(f"{'n':>8} {'lowess (s)':>11} {'binned (s)':>11} {'speedup':>9} {'max rel diff':>13}")
+
+    for n in args.sizes:
+        pairs = diagnostic_data(n, rng)
+
+        # All three panels, as generate_diagnostic_plots computes them
+        t_binned, binned = best_time(lambda: smooth_many(pairs, smoother='binned'), args.repeats)
+
+        if n <= args.lowess_max:
+            t_exact, exact = best_time(lambda: [smooth(y, x, smoother='lowess') for y, x in pairs], args.repeats)
+            diff = max(max_difference(e, b) for e, b in zip(exact, binned))
+            print(f"{n:>8} {t_exact:11.3f} {t_binned:11.3f} {t_exact / t_binned:8.1f}x {diff:13.2e}")
+        else:
+            print(f"{n:>8} {'skipped':>11} {t_binned:11.3f} {'-':>9} {'-':>13}")
+
+
+if __name__ == '__main__':
+    main()
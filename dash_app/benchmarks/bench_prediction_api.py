@@ -0,0 +1,110 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import logging
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from dash import Dash
+from werkzeug.serving import make_server
+
+# The Predict button runs in the browser by default; the benchmark times the
+# server-side callback, which is only registered with BODYFAT_CLIENTSIDE=0
+os.environ['BODYFAT_CLIENTSIDE'] = '0'
+
+from estimation_page.estimation_dashboard import estimation_layout, model_artifact
+from estimation_page.prediction_api import register_prediction_api
+
+
+def start_server(port):
+    # The estimator page (whose callback registers on import) plus the JSON route,
+    # served by a threaded werkzeug server in the background
+    app = Dash(__name__, suppress_callback_exceptions=True)
+    app.layout = estimation_layout
+    register_prediction_api(app.server, model_artifact)
+
+    # Keep the per-request access log out of the timings
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', port, app.server, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def callback_payload(age, abdomen):
+    # Request the browser sends when the Predict button is clicked
+    return {
+        'output': '..bodyfat-plot.figure...number-line-group.data..',
+        'outputs': [{'id': 'bodyfat-plot', 'property': 'figure'},
+                    {'id': 'number-line-group', 'property': 'data'}],
+        'inputs': [{'id': 'predict-button', 'property': 'n_clicks', 'value': 1}],
+        'state': [{'id': 'input-age', 'property': 'value', 'value': age},
+                  {'id': 'input-abdomen', 'property': 'value', 'value': abdomen},
+                  {'id': 'number-line-group', 'property': 'data', 'value': None}],
+        'changedPropIds': ['predict-button.n_clicks']
+    }
+
+
+def post(url, payload):
+    # Wall clock latency of one JSON POST, in milliseconds
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        response.read()
+    return (time.perf_counter() - start) * 1000
+
+
+def run_load(url, payloads, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return np.array(list(executor.map(lambda payload: post(url, payload), payloads)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latency of the JSON prediction route versus the Dash callback.')
+    parser.add_argument('--requests', type=int, default=2_000)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--batch-size', type=int, default=1_000,
+                        help='Records per request for the batch scenario.')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    server = start_server(args.port)
+    base = f'http://127.0.0.1:{args.port}'
+
+    rng = np.random.default_rng(123)
+    ages = rng.integers(21, 80, args.requests).tolist()
+    abdomens = rng.uniform(70, 120, args.requests).round(1).tolist()
+
+    batch = [{'age': a, 'abdomen': b} for a, b in zip(ages, abdomens)][:args.batch_size]
+    scenarios = [
+        ('api, 1 record', f'{base}/api/predict',
+         [{'age': a, 'abdomen': b} for a, b in zip(ages, abdomens)]),
+        (f'api, {len(batch)} records', f'{base}/api/predict',
+         [batch] * max(args.requests // 10, 1)),
+        ('dash callback', f'{base}/_dash-update-component',
+         [callback_payload(a, b) for a, b in zip(ages, abdomens)])
+    ]
+
+    # Warm up every route once
+    for _, url, payloads in scenarios:
+        post(url, payloads[0])
+
+    print(f"{'scenario':>20} {'clients':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} {'req/s':>8}")
+    for name, url, payloads in scenarios:
+        for concurrency in args.concurrency:
+            start = time.perf_counter()
+            latencies = run_load(url, payloads, concurrency)
+            throughput = len(payloads) / (time.perf_counter() - start)
+            p50, p99 = np.percentile(latencies, [50, 99])
+            print(f"{name:>20} {concurrency:>8} {p50:9.2f} {p99:9.2f} {throughput:8.0f}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
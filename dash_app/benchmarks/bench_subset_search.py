@@ -0,0 +1,129 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Time the computations themselves, not loads from the on-disk results cache
+os.environ['BODYFAT_MEMO'] = '0'
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from model.multiple_regression import fit_all_combinations
+from model.best_subset import branch_and_bound_subsets, gram_all_combinations
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                       'dataset', 'BodyFat.csv')
+
+
+def time_method(X_train, X_test, y_train, y_test, method, repeats, n_jobs=1):
+    # Best-of-n wall clock time and the last result
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        results_df = fit_all_combinations(X_train, X_test, y_train, y_test, method=method, n_jobs=n_jobs)
+        best = min(best, time.perf_counter() - start)
+    return best, results_df
+
+
+def max_difference(reference, other):
+    # Largest absolute difference in R-squared / RMSE / Mean VIF after aligning on Features
+    merged = reference.merge(other, on='Features', suffixes=('_ref', '_new'))
+    diffs = [np.nanmax(np.abs(merged[f'{col}_ref'] - merged[f'{col}_new']))
+             for col in ['R-squared', 'RMSE', 'Mean VIF']]
+    return max(diffs)
+
+
+def derived_features(df):
+    # Wide, strongly correlated predictors of the kind the branch-and-bound search is
+    # meant for: the measurements, their squares and circumference ratios. DENSITY is
+    # left out, as it determines BODYFAT (Siri's equation) and would make every search trivial.
+    base = [col for col in df.columns if col not in ('IDNO', 'BODYFAT', 'DENSITY')]
+    circumferences = ['NECK', 'CHEST', 'ABDOMEN', 'HIP', 'THIGH', 'KNEE', 'ANKLE', 'BICEPS', 'FOREARM', 'WRIST']
+
+    X = df[base].astype(float)
+    columns = [X]
+    columns.append((X ** 2).add_suffix('^2'))
+    columns.append(X[circumferences].div(X['HEIGHT'], axis=0).add_suffix('/HEIGHT'))
+    columns.append(pd.DataFrame({f'ABDOMEN/{col}': X['ABDOMEN'] / X[col]
+                                 for col in circumferences if col != 'ABDOMEN'}))
+    return pd.concat(columns, axis=1)
+
+
+def top_k_from_exhaustive(results_df, top_k):
+    # Top-k subsets of every size by training R-squared (= smallest RSS) from a full enumeration
+    sizes = results_df['Features'].str.count(',') + 1
+    ranked = results_df.assign(size=sizes).sort_values(['size', 'R-squared'], ascending=[True, False])
+    return set(ranked.groupby('size').head(top_k)['Features'])
+
+
+def bench_branch_and_bound(df, sizes, top_k, exhaustive_max):
+    X = derived_features(df)
+    y = df['BODYFAT']
+
+    print(f"\nbranch-and-bound, top {top_k} per size, derived features")
+    print(f"{'p':>3} {'subsets':>16} {'bnb (s)':>9} {'rows':>6} {'exhaustive':>11}")
+
+    for p in sizes:
+        X_train, X_test, y_train, y_test = train_test_split(X.iloc[:, :p], y, test_size=0.2, random_state=123)
+
+        start = time.perf_counter()
+        results_df = branch_and_bound_subsets(X_train, X_test, y_train, y_test, top_k=top_k)
+        elapsed = time.perf_counter() - start
+
+        # Check the retained subsets against a full enumeration where that is affordable
+        if p <= exhaustive_max:
+            exhaustive_df = gram_all_combinations(X_train, X_test, y_train, y_test)
+            check = 'match' if set(results_df['Features']) == top_k_from_exhaustive(exhaustive_df, top_k) else 'MISMATCH'
+        else:
+            check = 'skipped'
+
+        print(f"{p:>3} {2 ** p - 1:>16} {elapsed:9.3f} {len(results_df):>6} {check:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the subset search engines of fit_all_combinations.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5, 8, 10, 12, 15],
+                        help='Numbers of predictors to search over (taken from BodyFat.csv in column order).')
+    parser.add_argument('--statsmodels-max', type=int, default=10,
+                        help='Largest number of predictors to run the statsmodels loop on.')
+    parser.add_argument('--repeats', type=int, default=1)
+    parser.add_argument('--n-jobs', type=int, default=1,
+                        help='Worker processes for every engine (-1 uses every core).')
+    parser.add_argument('--bnb-sizes', type=int, nargs='+', default=[15, 20, 30, 40],
+                        help='Numbers of derived predictors (squares and ratios) for the branch-and-bound search.')
+    parser.add_argument('--top-k', type=int, default=5, help='Subsets kept per size by the branch-and-bound search.')
+    parser.add_argument('--exhaustive-max', type=int, default=15,
+                        help='Largest number of derived predictors to check against a full enumeration.')
+    args = parser.parse_args()
+
+    df = pd.read_csv(DATASET)
+    predictors = [col for col in df.columns if col not in ('IDNO', 'BODYFAT')]
+
+    print(f"{'p':>3} {'subsets':>8} {'statsmodels (s)':>16} {'gram (s)':>10} {'gray (s)':>10} {'speedup':>9} {'max diff':>10}")
+
+    for p in args.sizes:
+        X = df[predictors[:p]]
+        y = df['BODYFAT']
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=123)
+
+        t_gram, gram_df = time_method(X_train, X_test, y_train, y_test, 'gram', args.repeats, args.n_jobs)
+        t_gray, gray_df = time_method(X_train, X_test, y_train, y_test, 'gray', args.repeats, args.n_jobs)
+
+        if p <= args.statsmodels_max:
+            t_sm, sm_df = time_method(X_train, X_test, y_train, y_test, 'statsmodels', 1, args.n_jobs)
+            speedup = f"{t_sm / t_gray:8.1f}x"
+            diff = max(max_difference(sm_df, gram_df), max_difference(sm_df, gray_df))
+            t_sm = f"{t_sm:16.3f}"
+        else:
+            t_sm, speedup = f"{'skipped':>16}", f"{'-':>9}"
+            diff = max_difference(gram_df, gray_df)
+
+        print(f"{p:>3} {2 ** p - 1:>8} {t_sm} {t_gram:10.3f} {t_gray:10.3f} {speedup} {diff:10.2e}")
+
+    bench_branch_and_bound(df, args.bnb_sizes, args.top_k, args.exhaustive_max)
+
+
+if __name__ == '__main__':
+    main()
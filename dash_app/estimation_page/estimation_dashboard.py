@@ -4,27 +4,71 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 import plotly.graph_objs as go
-from dash import dcc, html, Input, Output, State, callback
+from dash import dcc, html, Input, Output, State, Patch, callback, clientside_callback, ClientsideFunction
 
-# Given model coefficients and standard errors (unchanged)
-intercept = -31.8595
-age_coef = 0.0554
-abdomen_coef = 0.5281
+# Ensure the current working directory is part of the path
+sys.path.append(os.getcwd())
+
+from model.artifact import load_model_artifact
+from model.scoring import AGE_GROUPS, BAND_LABELS, MIN_AGE, MIN_ABDOMEN
+
+# Published model (coefficients, (X'X)^-1, fit metadata), memory-mapped once at startup;
+# regenerate with `python model/artifact.py`
+model_artifact = load_model_artifact()
+
+# Evaluate the prediction and number line in the browser (assets/estimator.js);
+# BODYFAT_CLIENTSIDE=0 falls back to the server-side callback
+clientside = os.environ.get('BODYFAT_CLIENTSIDE', '1') != '0'
+
+# Everything the clientside callback needs, served with the layout
+model_params = {
+    'intercept': model_artifact.intercept,
+    'coefficients': model_artifact.slopes.to_dict(),
+    'age_groups': [{'min': low, 'max': high, 'thresholds': list(thresholds)}
+                   for low, high, thresholds in AGE_GROUPS],
+    'labels': list(BAND_LABELS),
+    'range': [0, 50],
+    'min_age': MIN_AGE,
+    'min_abdomen': MIN_ABDOMEN
+}
 
 # Function to predict body fat percentage
 def predict_body_fat(age, abdomen):
-    return intercept + age_coef * age + abdomen_coef * abdomen
+    return float(model_artifact.predict({'AGE': age, 'ABDOMEN': abdomen})[0])
 
 # Function to get classification ranges based on age
 def get_classification_ranges(age):
-    if 20 <= age <= 39:
-        return 0, 50, [8, 20, 25], ["Very Thin", "Normal", "High", "Obese"]  # Changed range_max to 50
-    elif 40 <= age <= 59:
-        return 0, 50, [11, 22, 28], ["Very Thin", "Normal", "High", "Obese"]  # Changed range_max to 50
-    elif 60 <= age <= 79:
-        return 0, 50, [13, 25, 30], ["Very Thin", "Normal", "High", "Obese"]  # Changed range_max to 50
-    else:
-        return None
+    # Age groups and thresholds are shared with the bulk scorer (model/scoring.py)
+    for low, high, thresholds in AGE_GROUPS:
+        if low <= age <= high:
+            return 0, 50, list(thresholds), list(BAND_LABELS)
+    return None
+
+# Index into AGE_GROUPS of the band thresholds used for an age (None outside them)
+def get_age_group(age):
+    for i, (low, high, _) in enumerate(AGE_GROUPS):
+        if low <= age <= high:
+            return i
+    return None
+
+# Positions of the band labels, centered between the thresholds
+def get_label_positions(range_min, range_max, thresholds, n_labels):
+    positions = []
+    for i in range(n_labels):
+        if i == 0:
+            positions.append((range_min + thresholds[0]) / 2)
+        elif i == n_labels - 1:
+            positions.append((thresholds[-1] + range_max) / 2)
+        else:
+            positions.append((thresholds[i-1] + thresholds[i]) / 2)
+    return positions
+
+# Bifurcation lines, adjusted slightly to prevent overlap
+def get_adjusted_thresholds(thresholds):
+    return [thresholds[0] - 0.05, thresholds[1] + 0.05, thresholds[2] - 0.05]
+
+def get_plot_title(body_fat):
+    return f"<b>Estimated Bodyfat:<b> {body_fat:.1f}%"
 
 # Function to generate number line plot
 def generate_number_line_plot(age, body_fat):
@@ -33,14 +77,7 @@ def generate_number_line_plot(age, body_fat):
     fig = go.Figure()
 
     # Add labels
-    for i, label in enumerate(labels):
-        if i == 0:
-            x_pos = (range_min + thresholds[0]) / 2
-        elif i == len(labels) - 1:
-            x_pos = (thresholds[-1] + range_max) / 2
-        else:
-            x_pos = (thresholds[i-1] + thresholds[i]) / 2
-        
+    for label, x_pos in zip(labels, get_label_positions(range_min, range_max, thresholds, len(labels))):
         fig.add_annotation(
             x=x_pos,
             y=0.7,
@@ -59,7 +96,7 @@ def generate_number_line_plot(age, body_fat):
     ))
 
     # Adjust the bifurcation lines slightly to prevent overlap
-    adjusted_thresholds = [thresholds[0] - 0.05, thresholds[1] + 0.05, thresholds[2] - 0.05]
+    adjusted_thresholds = get_adjusted_thresholds(thresholds)
 
     # Customize the layout
     fig.update_layout(
@@ -88,7 +125,7 @@ def generate_number_line_plot(age, body_fat):
             dict(type="line", x0=adjusted_thresholds[2], x1=adjusted_thresholds[2], y0=0, y1=1, line=dict(color="black", width=2), layer="below"),
             dict(type="line", x0=0, x1=50, y0=0.5, y1=0.5, line=dict(color="black", width=2), layer="below"),  # Main line across the plot
         ],
-        title=dict(text=f"<b>Estimated Bodyfat:<b> {body_fat:.1f}%", x=0.5, y=0.95),
+        title=dict(text=get_plot_title(body_fat), x=0.5, y=0.95),
         showlegend=False,
         plot_bgcolor='#FFFFFF',  # Transparent background
         paper_bgcolor='#FFFFFF'
@@ -96,6 +133,27 @@ def generate_number_line_plot(age, body_fat):
 
     return fig
 
+# Partial update of a number line already drawn by generate_number_line_plot: only the
+# marker and title change, plus the ticks, labels and dividers if the age group did
+def patch_number_line_plot(age, body_fat, group_changed):
+    patched = Patch()
+    patched['data'][0]['x'] = [body_fat]
+    patched['layout']['title']['text'] = get_plot_title(body_fat)
+
+    if group_changed:
+        range_min, range_max, thresholds, labels = get_classification_ranges(age)
+        ticks = [range_min] + thresholds + [range_max]
+        patched['layout']['xaxis']['tickvals'] = ticks
+        patched['layout']['xaxis']['ticktext'] = [f"{t}%" for t in ticks]
+
+        for i, x_pos in enumerate(get_label_positions(range_min, range_max, thresholds, len(labels))):
+            patched['layout']['annotations'][i]['x'] = x_pos
+        for i, x_pos in enumerate(get_adjusted_thresholds(thresholds)):
+            patched['layout']['shapes'][i]['x0'] = x_pos
+            patched['layout']['shapes'][i]['x1'] = x_pos
+
+    return patched
+
 # Layout for the app
 estimation_layout = html.Div([
     html.Div([
@@ -157,7 +215,14 @@ estimation_layout = html.Div([
             }),
 
             # Plot for the number line
-            dcc.Graph(id='bodyfat-plot')
+            dcc.Graph(id='bodyfat-plot'),
+
+            # Model coefficients and band thresholds for the clientside callback
+            dcc.Store(id='model-params', data=model_params),
+
+            # Age group of the number line currently drawn (None before the first
+            # prediction), so the server callback can send partial updates
+            dcc.Store(id='number-line-group', data=None)
         ], style={
             'background-color': 'white', 'padding': '30px', 'border-radius': '10px', 'max-width': '480px',
             'margin': '0 auto', 'box-shadow': '3px 3px 3px rgba(0, 0, 0, 0)'  # Uniform shadow around the box
@@ -186,21 +251,43 @@ estimation_layout = html.Div([
 ])
 
 # Callback to update the plot
-@callback(
-    Output('bodyfat-plot', 'figure'),
-    [Input('predict-button', 'n_clicks')],
-    [State('input-age', 'value'),
-     State('input-abdomen', 'value')]
-)
-def update_prediction(n_clicks, age, abdomen):
+def update_prediction(n_clicks, age, abdomen, current_group=None):
     if n_clicks > 0 and age and abdomen:
-        if age < 21 or abdomen < 38:
-            return {}
+        if age < MIN_AGE or abdomen < MIN_ABDOMEN:
+            return {}, None
+
+        # No body fat bands outside the guideline age groups
+        group = get_age_group(age)
+        if group is None:
+            return {}, None
 
         predicted_bodyfat = predict_body_fat(age, abdomen)
 
+        # Patch the figure already on the page instead of resending all of it
+        if current_group is not None:
+            return patch_number_line_plot(age, predicted_bodyfat, group != current_group), group
+
         # Generate the plot with dynamic title
         fig = generate_number_line_plot(age, predicted_bodyfat)
-        return fig
+        return fig, group
 
-    return {}
+    return {}, None
+
+if clientside:
+    clientside_callback(
+        ClientsideFunction(namespace='estimator', function_name='update_prediction'),
+        Output('bodyfat-plot', 'figure'),
+        [Input('predict-button', 'n_clicks')],
+        [State('input-age', 'value'),
+         State('input-abdomen', 'value'),
+         State('model-params', 'data')]
+    )
+else:
+    callback(
+        [Output('bodyfat-plot', 'figure'),
+         Output('number-line-group', 'data')],
+        [Input('predict-button', 'n_clicks')],
+        [State('input-age', 'value'),
+         State('input-abdomen', 'value'),
+         State('number-line-group', 'data')]
+    )(update_prediction)
@@ -0,0 +1,100 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from flask import jsonify, request
+
+# Ensure the current working directory is part of the path
+sys.path.append(os.getcwd())
+
+from model.scoring import classify_bands, BAND_LABELS, MIN_AGE, MIN_ABDOMEN
+
+
+class PredictionRequestError(ValueError):
+    pass
+
+
+def _parse_records(payload, features):
+    # Feature matrix (model order) from one record or a list of records, each keyed
+    # by the lower-cased feature names, e.g. {"age": 40, "abdomen": 90}
+    records = payload if isinstance(payload, list) else [payload]
+    if not records:
+        raise PredictionRequestError("Expected at least one record")
+
+    try:
+        X = np.array([[record[name.lower()] for name in features] for record in records], dtype=float)
+    except (KeyError, TypeError, ValueError):
+        fields = ', '.join(f'"{name.lower()}"' for name in features)
+        raise PredictionRequestError(f"Every record must be an object with numeric {fields}")
+
+    if not np.isfinite(X).all():
+        raise PredictionRequestError("Values must be finite numbers")
+
+    return X
+
+
+def predict_records(payload, artifact):
+    """
+    Predicted body fat and band for one record or a list of records.
+
+    Parameters:
+    ----------
+    payload : dict or list of dict
+        Records with the model's features as lower-case keys ("age", "abdomen").
+    artifact : ModelArtifact
+        Loaded model.
+
+    Returns:
+    -------
+    response : dict
+        {"body_fat", "band"} for a single record, {"predictions": [...]} for a list.
+        Records below the page's input minimums (age 21, abdomen 38 cm) get nulls,
+        as do bands for ages outside the guideline age groups.
+    """
+
+    X = _parse_records(payload, artifact.features)
+    columns = {name: X[:, i] for i, name in enumerate(artifact.features)}
+
+    body_fat = artifact.predict(X)
+    bands = classify_bands(columns['AGE'], body_fat)
+    valid = (columns['AGE'] >= MIN_AGE) & (columns['ABDOMEN'] >= MIN_ABDOMEN)
+
+    # Convert to Python objects in bulk; -1 (no band) maps to the trailing None
+    labels = BAND_LABELS + [None]
+    predictions = [
+        {'body_fat': value if ok else None,
+         'band': labels[band] if ok else None}
+        for value, band, ok in zip(np.round(body_fat, 4).tolist(), bands.tolist(), valid.tolist())
+    ]
+
+    if isinstance(payload, list):
+        return {'predictions': predictions}
+    return predictions[0]
+
+
+def register_prediction_api(server, artifact, route='/api/predict'):
+    """
+    Add a JSON prediction route to the Dash app's Flask server.
+
+    POST a record ({"age": 40, "abdomen": 90}) or a list of records; the model is
+    evaluated once for the whole batch and no figure is built.
+    """
+
+    model_version = artifact.manifest['training_data_sha256'][:12]
+
+    def predict():
+        payload = request.get_json(silent=True)
+        if payload is None:
+            return jsonify({'error': 'Expected a JSON body'}), 400
+
+        try:
+            response = predict_records(payload, artifact)
+        except PredictionRequestError as e:
+            return jsonify({'error': str(e)}), 400
+
+        response['model'] = model_version
+        return jsonify(response)
+
+    server.add_url_rule(route, 'predict_api', predict, methods=['POST'])
+    return server
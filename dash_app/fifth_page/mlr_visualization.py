@@ -3,7 +3,6 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-import pandas as pd
 from dash import dcc, html
 import plotly.graph_objs as go
 from sklearn.model_selection import train_test_split
@@ -12,75 +11,158 @@ from sklearn.model_selection import train_test_split
 sys.path.append(os.getcwd())
 
 from model.multiple_regression import run_regression_and_summary, generate_diagnostic_plots, two_dim_regression
+from model.bootstrap import bootstrap_regression
+from model.datasets import load_dataset
+from model.page_artifacts import page_artifact
 
-# Load the data
-cleaned_df = pd.read_csv('https://raw.githubusercontent.com/Stochastic1017/Body_Fat_Study/refs/heads/main/dataset/cleaned_bodyfat_11.csv')
-cleaned_df = cleaned_df[cleaned_df["IDNO"] != 39] # removing observation outside cooks distance
 
-# Seperate features and response
-X = cleaned_df[["AGE", "ABDOMEN"]]
-y = cleaned_df["BODYFAT"]
+def fit_mlr_model():
+    """
+    Cleaned data, train-test split and fitted model of the fifth page.
 
-# Train-test split
-X_train, X_test, y_train, y_test = train_test_split(X, y, 
-                                                    test_size=0.2, 
-                                                    random_state=123)
+    Returns:
+    -------
+    cleaned_df, X_train, X_test, y_train, y_test, results
+    """
 
-# Fitting regression model
-results = run_regression_and_summary(X_train, y_train, X_test, y_test)
+    # Load the data
+    cleaned_df = load_dataset('cleaned_bodyfat_11.csv')
+    cleaned_df = cleaned_df[cleaned_df["IDNO"] != 39] # removing observation outside cooks distance
 
-scatter, plane, plot_layout, table_data = two_dim_regression(df=cleaned_df, results=results, feature_1='AGE', feature_2='ABDOMEN')
+    # Seperate features and response
+    X = cleaned_df[["AGE", "ABDOMEN"]]
+    y = cleaned_df["BODYFAT"]
 
-# Create the Dash layout
-regression_layout = html.Div([
-    html.Div([
+    # Train-test split
+    X_train, X_test, y_train, y_test = train_test_split(X, y, 
+                                                        test_size=0.2, 
+                                                        random_state=123)
+
+    # Fitting regression model
+    results = run_regression_and_summary(X_train, y_train, X_test, y_test)
+
+    return cleaned_df, X_train, X_test, y_train, y_test, results
+
+
+def regression_figures():
+    """3D regression plane and the table of fit metrics, as figures."""
+
+    cleaned_df, X_train, X_test, y_train, y_test, results = fit_mlr_model()
+    scatter, plane, plot_layout, table_data = two_dim_regression(df=cleaned_df, results=results, feature_1='AGE', feature_2='ABDOMEN')
+
+    return {
+        'scatter': {
+            'data': [scatter, plane],
+            'layout': plot_layout
+        },
+        'metrics': {
+            'data': [go.Table(
+                header=dict(values=['Metric', 'Value'],
+                            fill_color='#293241',  # Set a light background for readability
+                            font=dict(color='white', size=12),  # White text
+                            align='center'),  # Center align headers,
+                cells=dict(values=[list(row) for row in zip(*table_data[1:])],  # No duplicate header in table cells
+                            fill_color='white',
+                            align='center')
+            )],
+            'layout': go.Layout(
+                margin=dict(l=0, r=0, t=0, b=0)
+            )
+        }
+    }
+
+
+def build_regression_layout():
+    """3D regression plane next to the table of fit metrics."""
+
+    figures = page_artifact('mlr_regression', regression_figures)
+
+    # Create the Dash layout
+    return html.Div([
+        html.Div([
+            dcc.Graph(
+                id='3d-scatter-plot',
+                figure=figures['scatter'],
+                style={'height': '400px'}
+            )
+        ], style={'width': '55%', 'display': 'inline-block', 'vertical-align': 'top'}),  # Adjusted width for balance
+        html.Div([
+            dcc.Graph(
+                id='results-table',
+                figure=figures['metrics'],
+                style={'height': '400px'}  # Adjusted height to match the 3D plot
+            )
+        ], style={'width': '45%', 'display': 'inline-block', 'vertical-align': 'top'})  # Adjusted width for balance
+    ])
+
+
+def diagnostic_figure():
+    """Residual, Q-Q, scale-location and leverage plots of the fitted model."""
+
+    cleaned_df, X_train, X_test, y_train, y_test, results = fit_mlr_model()
+    return generate_diagnostic_plots(results, cleaned_df)
+
+
+def build_diagnostic_layout():
+    """Residual, Q-Q, scale-location and leverage plots."""
+
+    # Diagnostic plots figure
+    diagnostic_fig = page_artifact('mlr_diagnostics', diagnostic_figure)
+
+    return html.Div([
         dcc.Graph(
-            id='3d-scatter-plot',
-            figure={
-                'data': [scatter, plane],
-                'layout': plot_layout
-            },
-            style={'height': '400px'}
+            id='diagnostic-plots',
+            figure=diagnostic_fig,  # The diagnostic plot figure generated by the function
+            style={
+                'height': '800px',  # Reduced height
+                'width': '80%',     # Adjust width
+                'margin': '20px auto'  # Add margin to prevent overlap
+            }
+        )
+    ], style={
+        'display': 'flex',
+        'justify-content': 'center',
+        'align-items': 'center',
+        'padding': '20px',  # Add padding to avoid overlap with other content
+    })
+
+
+def bootstrap_figure():
+    """Table of bootstrap percentile intervals of the fitted model."""
+
+    cleaned_df, X_train, X_test, y_train, y_test, results = fit_mlr_model()
+
+    # Bootstrap percentile confidence intervals for the coefficients and test RMSE
+    bootstrap_ci = bootstrap_regression(X_train, y_train, X_test, y_test, n_boot=10_000, alpha=0.05)
+
+    return {
+        'data': [go.Table(
+            header=dict(values=['Term', 'Estimate', '95% CI Lower', '95% CI Upper'],
+                        fill_color='#293241',
+                        font=dict(color='white', size=12),
+                        align='center'),
+            cells=dict(values=[bootstrap_ci.index,
+                               bootstrap_ci['Estimate'].round(4),
+                               bootstrap_ci['CI Lower'].round(4),
+                               bootstrap_ci['CI Upper'].round(4)],
+                       fill_color='white',
+                       align='center')
+        )],
+        'layout': go.Layout(
+            margin=dict(l=0, r=0, t=0, b=0)
         )
-    ], style={'width': '55%', 'display': 'inline-block', 'vertical-align': 'top'}),  # Adjusted width for balance
-    html.Div([
+    }
+
+
+def build_bootstrap_layout():
+    """Table of bootstrap percentile intervals."""
+
+    bootstrap_fig = page_artifact('mlr_bootstrap', bootstrap_figure)
+
+    return html.Div([
         dcc.Graph(
-            id='results-table',
-            figure={
-                'data': [go.Table(
-                    header=dict(values=['Metric', 'Value'],
-                                fill_color='#293241',  # Set a light background for readability
-                                font=dict(color='white', size=12),  # White text
-                                align='center'),  # Center align headers,
-                    cells=dict(values=[list(row) for row in zip(*table_data[1:])],  # No duplicate header in table cells
-                                fill_color='white',
-                                align='center')
-                )],
-                'layout': go.Layout(
-                    margin=dict(l=0, r=0, t=0, b=0)
-                )
-            },
-            style={'height': '400px'}  # Adjusted height to match the 3D plot
+            id='bootstrap-ci-table',
+            figure=bootstrap_fig,
+            style={'height': '160px', 'width': '80%', 'margin': '20px auto'}
         )
-    ], style={'width': '45%', 'display': 'inline-block', 'vertical-align': 'top'})  # Adjusted width for balance
-])
-
-# Diagnostic plots figure
-diagnostic_fig = generate_diagnostic_plots(results, cleaned_df)
-
-diagnostic_layout = html.Div([
-    dcc.Graph(
-        id='diagnostic-plots',
-        figure=diagnostic_fig,  # The diagnostic plot figure generated by the function
-        style={
-            'height': '800px',  # Reduced height
-            'width': '80%',     # Adjust width
-            'margin': '20px auto'  # Add margin to prevent overlap
-        }
-    )
-], style={
-    'display': 'flex',
-    'justify-content': 'center',
-    'align-items': 'center',
-    'padding': '20px',  # Add padding to avoid overlap with other content
-})
+    ])
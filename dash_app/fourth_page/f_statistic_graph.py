@@ -12,27 +12,31 @@ from dash import html, dcc
 sys.path.append(os.getcwd())
 
 from model.goodness_of_fit import general_goodness_of_fit
+from model.datasets import load_dataset
 from model.prior_bmi_model_based_anomaly_detection import find_anomalies, clean_df
+from model.page_artifacts import page_artifact
 
-# Function to create the table layout
-def create_f_statistic_table(X, y):
+# Function to create the table figure
+def create_f_statistic_figure(X, y):
     """
-    Creates the F-statistic results table layout.
+    Creates the F-statistic results table figure.
 
     Parameters:
-    - df: The dataset to perform the goodness of fit test and present in the table.
+    - X: DataFrame of predictor variables.
+    - y: Series or array of the target variable.
 
     Returns:
-    - f_statistic_table_layout: A Dash layout containing the F-statistic table.
+    - fig: A Plotly figure containing the F-statistic table.
     """
 
-    # Performing Goodness of Fit test
-    f_test = general_goodness_of_fit(X, y)
+    # Performing Goodness of Fit test (with a permutation p-value that does not assume normal residuals)
+    f_test = general_goodness_of_fit(X, y, n_permutations=10_000)
 
     # Extract the F-test results
     F_statistic = f_test['F-statistic']
     F_critical = f_test['F-critical']
     p_value = f_test['p-value']
+    permutation_p_value = f_test['permutation p-value']
     p = len(X.columns) + 1
     n = X.shape[0]
     df_model = p - 1
@@ -40,10 +44,11 @@ def create_f_statistic_table(X, y):
 
     # Prepare the F-test results for the table
     f_test_data = {
-        'Statistic': ['F-statistic', 'F-critical', 'p-value', 'Degrees of Freedom (Model)', 'Degrees of Freedom (Residuals)'],
+        'Statistic': ['F-statistic', 'F-critical', 'p-value', 'Permutation p-value (10,000 permutations)', 'Degrees of Freedom (Model)', 'Degrees of Freedom (Residuals)'],
         'Value': [np.round(F_statistic, 5), 
                   np.round(F_critical, 5), 
                   np.round(p_value, 5), 
+                  np.round(permutation_p_value, 5), 
                   int(df_model), 
                   int(df_residual)]
     }
@@ -68,32 +73,39 @@ def create_f_statistic_table(X, y):
     fig.update_layout(
         title_x=0.5,  # Center the title
         margin=dict(l=50, r=50, t=30, b=30),  # Adjust margins (reduce bottom space)
-        height=200,  # Set a fixed height to reduce extra space
+        height=230,  # Set a fixed height to reduce extra space
         autosize=False  # Ensure the figure resizes well
     )
 
-    # Dash layout with the table
-    f_statistic_table_layout = html.Div([
-        dcc.Graph(
-            id='f_statistic-table',
-            figure=fig,
-            style={'height': '200px'}  # Adjusted height for the table
-            )
-    ], 
-    style={'display': 'flex', 'justify-content': 'center', 
-       'align-items': 'center', 'width': '100%'}  # Center the table
-    )
+    return fig
+
+def f_test_figure():
+    """Global F-test table figure of the cleaned dataset."""
 
-    return f_statistic_table_layout
+    # Load the data
+    cleaned_df = load_dataset('cleaned_bodyfat_11.csv')
 
-# Load the data
-cleaned_df = pd.read_csv('https://raw.githubusercontent.com/Stochastic1017/Body_Fat_Study/refs/heads/main/dataset/cleaned_bodyfat_11.csv')
+    # Seperate features and response
+    X = cleaned_df[["AGE", "ADIPOSITY", "CHEST", "ABDOMEN", "THIGH"]]
+    y = cleaned_df["BODYFAT"]
 
-# Seperate features and response
-X = cleaned_df[["AGE", "ADIPOSITY", "CHEST", "ABDOMEN", "THIGH"]]
-y = cleaned_df["BODYFAT"]
+    return create_f_statistic_figure(X, y)
 
-# Main layout for your Dash app
-f_test_table = html.Div([
-    create_f_statistic_table(X, y)
-])
+def build_f_test_table():
+    """Global F-test table, read from the page artifacts when built, on first request."""
+
+    fig = page_artifact('f_test_table', f_test_figure)
+
+    # Dash layout with the table
+    return html.Div([
+        html.Div([
+            dcc.Graph(
+                id='f_statistic-table',
+                figure=fig,
+                style={'height': '230px'}  # Adjusted height for the table
+                )
+        ], 
+        style={'display': 'flex', 'justify-content': 'center', 
+           'align-items': 'center', 'width': '100%'}  # Center the table
+        )
+    ])
@@ -4,213 +4,222 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from dash import dcc, html
-from fourth_page.f_statistic_graph import f_test_table
-from fourth_page.most_significant_features import best_predictors_table
-from fourth_page.feature_combination_table import combination_table_layout
+from fourth_page.f_statistic_graph import build_f_test_table
+from fourth_page.most_significant_features import build_best_predictors_table
+from fourth_page.feature_combination_table import build_combination_table_layout
 
-# Main layout for the fourth page
-fourth_layout = html.Div([
-    html.H1("Feature Optimization for Body Fat Estimation",
-        style={'text-align': 'center', 'color': '#EE6C4D'}),
 
-    html.H3("Preliminary eliminating irrelevant features:",
-            style={'text-align': 'left', 'color': '#293241'}),
+def build_fourth_layout():
+    """
+    Layout of the fourth page. Fits the models behind its tables, so it is built on
+    first request rather than at import.
+    """
 
-    dcc.Markdown('''
-        To improve model accuracy and efficiency, we begin by removing features that are either redundant or provide little value to body fat estimation.
+    # Main layout for the fourth page
+    return html.Div([
+        html.H1("Feature Optimization for Body Fat Estimation",
+            style={'text-align': 'center', 'color': '#EE6C4D'}),
+
+        html.H3("Preliminary eliminating irrelevant features:",
+                style={'text-align': 'left', 'color': '#293241'}),
 
-        * $$\\texttt{DENSITY}$$: This feature is excluded as it requires underwater weighing, a process that is expensive and impractical for most body fat estimation applications.
+        dcc.Markdown('''
+            To improve model accuracy and efficiency, we begin by removing features that are either redundant or provide little value to body fat estimation.
 
-        * $$\\texttt{WEIGHT}$$, $$\\texttt{HEIGHT}$$: Since $$\\texttt{ADIPOSITY}$$ (Body Mass Index) is a function of $$\\texttt{WEIGHT}$$ and $$\\texttt{HEIGHT}$$, these features are removed to avoid redundancy and prevent multicollinearity in the model.
+            * $$\\texttt{DENSITY}$$: This feature is excluded as it requires underwater weighing, a process that is expensive and impractical for most body fat estimation applications.
 
-        * $$\\texttt{NECK}$$, $$\\texttt{KNEE}$$, $$\\texttt{ANKLE}$$, $$\\texttt{BICEPS}$$, $$\\texttt{FOREARM}$$, $$\\texttt{WRIST}$$, $$\\texttt{HIP}$$: These distal limb measurements are less directly related to body fat percentage compared to key circumferences like $$\\texttt{ABDOMEN}$$ and $$\\texttt{CHEST}$$. Removing them reduces noise and complexity, focusing the model on more predictive features.
+            * $$\\texttt{WEIGHT}$$, $$\\texttt{HEIGHT}$$: Since $$\\texttt{ADIPOSITY}$$ (Body Mass Index) is a function of $$\\texttt{WEIGHT}$$ and $$\\texttt{HEIGHT}$$, these features are removed to avoid redundancy and prevent multicollinearity in the model.
 
-        Therefore, we will choose the best predictors for our model from the following: $$\\texttt{AGE}$$, $$\\texttt{ADIPOSITY}$$, $$\\texttt{CHEST}$$, $$\\texttt{ABDOMEN}$$, and $$\\texttt{THIGH}$$.
-''', mathjax=True),
+            * $$\\texttt{NECK}$$, $$\\texttt{KNEE}$$, $$\\texttt{ANKLE}$$, $$\\texttt{BICEPS}$$, $$\\texttt{FOREARM}$$, $$\\texttt{WRIST}$$, $$\\texttt{HIP}$$: These distal limb measurements are less directly related to body fat percentage compared to key circumferences like $$\\texttt{ABDOMEN}$$ and $$\\texttt{CHEST}$$. Removing them reduces noise and complexity, focusing the model on more predictive features.
 
-    html.H3("Goodness of fit test to test if any predictor is useful:",
-            style={'text-align': 'left', 'color': '#293241'}),
-    
-    dcc.Markdown('''Let $\\mathcal{X} =$ {$$\\texttt{AGE}$$, $$\\texttt{ADIPOSITY}$$, $$\\texttt{CHEST}$$, $$\\texttt{ABDOMEN}$$, $$\\texttt{THIGH}$$} be the set of our features.
-''', mathjax=True),
+            Therefore, we will choose the best predictors for our model from the following: $$\\texttt{AGE}$$, $$\\texttt{ADIPOSITY}$$, $$\\texttt{CHEST}$$, $$\\texttt{ABDOMEN}$$, and $$\\texttt{THIGH}$$.
+    ''', mathjax=True),
 
-    dcc.Markdown('''For feature $i \\in \\mathcal{X}$, let $\\beta_{i}$ be the corresponding regression coefficient, consider the following null and alternate hypothesis:              
-''', mathjax=True),
+        html.H3("Goodness of fit test to test if any predictor is useful:",
+                style={'text-align': 'left', 'color': '#293241'}),
 
-    html.Div([
-        dcc.Markdown('''
-        $$H_0: \\forall i \\in \\mathcal{X}, \\quad \\beta_{i} = 0$$
-                    
-        $$H_1: \\exists i \\in \\mathcal{X}, \\quad \\beta_{i} \\neq 0$$
-''', mathjax=True)], style={'text-align': 'center'}),
-
-    dcc.Markdown(''' 
-    We conduct the F-test for significance as follows:
-
-    Let $n$ represent the number of observations, and $p$ represent the number of predictors in the model.
-
-    **Step 1: Total Sum of Squares (SST)**
-                
-    This measures the total variance in the dependent variable $y$:
-    $$
-    \\text{SST} = \\sum_{i=1}^{n} (y_i - \\bar{y})^2
-    $$
-    Where $\\bar{y}$ is the mean of the observed values.
-
-    **Step 2: Residual Sum of Squares (SSE)**
-                
-    This measures the variance that is *not explained* by the regression model:
-    $$
-    \\text{SSE} = \\sum_{i=1}^{n} (y_i - \\hat{y}_i)^2
-    $$
-    Where $\\hat{y}_i$ is the predicted value from the model for each observation.
-
-    **Step 3: Regression Sum of Squares (SSR)**
-                
-    This measures the variance that is *explained* by the model:
-    $$
-    \\text{SSR} = \\text{SST} - \\text{SSE}
-    $$
-
-    **Step 4: Mean Squares and F-statistic**
-                
-    The Mean Squared Error (MSE) and the Mean Squared Regression (MSR) are calculated as follows:
-    $$
-    \\text{MSE} = \\frac{\\text{SSE}}{n - p}
-    \\quad \\text{and} \\quad
-    \\text{MSR} = \\frac{\\text{SSR}}{p - 1}
-    $$
-
-    Finally, the F-statistic is calculated as:
-    $$
-    F = \\frac{\\text{MSR}}{\\text{MSE}}
-    $$
-
-    This F-statistic is compared to a critical value from the F-distribution. 
-    If the F-statistic is larger than the critical value, or if the p-value is less than the significance level, we reject the null hypothesis that no predictors are useful.
+        dcc.Markdown('''Let $\\mathcal{X} =$ {$$\\texttt{AGE}$$, $$\\texttt{ADIPOSITY}$$, $$\\texttt{CHEST}$$, $$\\texttt{ABDOMEN}$$, $$\\texttt{THIGH}$$} be the set of our features.
     ''', mathjax=True),
 
-    f_test_table,
+        dcc.Markdown('''For feature $i \\in \\mathcal{X}$, let $\\beta_{i}$ be the corresponding regression coefficient, consider the following null and alternate hypothesis:              
+    ''', mathjax=True),
 
-    dcc.Markdown("We can see that, as the p-value $$\\approx$$ 0, we can conclude that at least one predictor is useful.", mathjax=True),
+        html.Div([
+            dcc.Markdown('''
+            $$H_0: \\forall i \\in \\mathcal{X}, \\quad \\beta_{i} = 0$$
 
-    html.H3("ANOVA-Based Stepwise Feature Selection with Holm-Bonferroni Correction:",
-            style={'text-align': 'left', 'color': '#293241'}),
+            $$H_1: \\exists i \\in \\mathcal{X}, \\quad \\beta_{i} \\neq 0$$
+    ''', mathjax=True)], style={'text-align': 'center'}),
 
-dcc.Markdown('''
-    To determine the most significant predictors in our model, we use a combination of **F-tests** and the **Holm-Bonferroni correction**.
+        dcc.Markdown(''' 
+        We conduct the F-test for significance as follows:
 
-    1. **F-Tests for each predictor**: 
-    * For each predictor, we create a reduced model by excluding that variable and compare it to the full model using an Analysis of Variance (**ANOVA**). 
-    * The *F-test* evaluates whether the excluded predictor contributes significantly to explaining the variance in the response variable.
-    
-    * The null and alternative hypotheses for the F-test (where $$j$$ is the predictor of interest) are:
-    
-    $$
-    H_0: \\beta_{j} = 0
-    $$
+        Let $n$ represent the number of observations, and $p$ represent the number of predictors in the model.
 
-    $$
-    H_1: \\beta_{j} \\neq 0
-    $$
-    
-    * The *F-statistic* is calculated as:
-    $$
-    F = \\frac{\\left( \\text{SSR}_{\\text{reduced}} - \\text{SSR}_{\\text{full}} \\right) / (p_{\\text{reduced}} - p_{\\text{full}})}{\\text{SSR}_{\\text{full}} / (n - p_{\\text{full}})}
-    $$
-    * where:
-        - $$\\text{SSR}_{\\text{reduced}}$$ is the sum of squared residuals for the reduced model,
-        - $$\\text{SSR}_{\\text{full}}$$ is the sum of squared residuals for the full model,
-        - $$p_{\\text{reduced}}$$ and $$p_{\\text{full}}$$ are the number of parameters (including the intercept) in the reduced and full models,
-        - $$n$$ is the number of observations.
+        **Step 1: Total Sum of Squares (SST)**
 
-    2. **Holm-Bonferroni Correction**:
-    * To control for the increased risk of Type I errors due to multiple hypothesis testing, we apply the **Holm-Bonferroni correction**.
-    * This method adjusts the significance threshold for each predictor based on the number of comparisons.
-    * The steps of the Holm-Bonferroni correction are:
-        - Sort the p-values from smallest to largest: 
+        This measures the total variance in the dependent variable $y$:
         $$
-        p_1 \\leq p_2 \\leq \\dots \\leq p_m
+        \\text{SST} = \\sum_{i=1}^{n} (y_i - \\bar{y})^2
         $$
-        - For each p-value, calculate the adjusted threshold using $$\\alpha$$ (significance level 0.05), $$m$$ (total number of tests), $$i$$ (index of the p-value in the sorted list).
+        Where $\\bar{y}$ is the mean of the observed values.
+
+        **Step 2: Residual Sum of Squares (SSE)**
+
+        This measures the variance that is *not explained* by the regression model:
         $$
-        \\alpha_{\\text{adjusted}} = \\frac{\\alpha}{m - i + 1}
+        \\text{SSE} = \\sum_{i=1}^{n} (y_i - \\hat{y}_i)^2
         $$
-    * Compare each p-value to its corresponding threshold, and reject the null hypothesis if: 
-    $$
-    p_i < \\alpha_{\\text{adjusted}}
-    $$
+        Where $\\hat{y}_i$ is the predicted value from the model for each observation.
 
-    3. **Final Selection**:
-    * Predictors are considered significant if their adjusted p-values remain below the corresponding Holm-Bonferroni threshold.
-    * This approach ensures that only the most informative predictors are retained while controlling for false discoveries.
+        **Step 3: Regression Sum of Squares (SSR)**
 
-    This procedure helps in refining our model by retaining only the variables that add the most value to predicting the target outcome.
-''', mathjax=True),
+        This measures the variance that is *explained* by the model:
+        $$
+        \\text{SSR} = \\text{SST} - \\text{SSE}
+        $$
 
-    best_predictors_table,
+        **Step 4: Mean Squares and F-statistic**
 
-    dcc.Markdown('''
-    We can see that, the features $$\\texttt{AGE}$$ and $$\\texttt{ABDOMEN}$$ are the most significant (or useful) predictors for our multiple linear regression model.
-''', mathjax=True),
+        The Mean Squared Error (MSE) and the Mean Squared Regression (MSR) are calculated as follows:
+        $$
+        \\text{MSE} = \\frac{\\text{SSE}}{n - p}
+        \\quad \\text{and} \\quad
+        \\text{MSR} = \\frac{\\text{SSR}}{p - 1}
+        $$
 
-    html.H3("Feature selection via trade-off analysis of combinations:",
-            style={'text-align': 'left', 'color': '#293241'}),
+        Finally, the F-statistic is calculated as:
+        $$
+        F = \\frac{\\text{MSR}}{\\text{MSE}}
+        $$
 
-    dcc.Markdown('''
-    In this alternate feature selection procedure, we evaluate all possible combinations of features to find the optimal subset that maximizes model performance while balancing complexity. The goal is to maximize **R-squared** (explained variance), minimize **RMSE** (prediction error), and reduce **Mean VIF** (multicollinearity).
+        This F-statistic is compared to a critical value from the F-distribution. 
+        If the F-statistic is larger than the critical value, or if the p-value is less than the significance level, we reject the null hypothesis that no predictors are useful.
+        ''', mathjax=True),
 
-    We prioritize parsimony by excluding features that add little to the model's performance. When additional features do not substantially improve R-squared or reduce RMSE, we prefer a simpler model to avoid overfitting.
+        build_f_test_table(),
 
-    The trade-off is to balance model accuracy and interpretability by selecting only those features that contribute meaningfully to the model's predictive power.
-    '''),
+        dcc.Markdown("We can see that, as the p-value $$\\approx$$ 0, we can conclude that at least one predictor is useful.", mathjax=True),
 
-    combination_table_layout,
+        html.H3("ANOVA-Based Stepwise Feature Selection with Holm-Bonferroni Correction:",
+                style={'text-align': 'left', 'color': '#293241'}),
 
     dcc.Markdown('''
-    Similar to the ANOVA-Based Stepwise Feature Selection with Holm-Bonferroni Correction, we find that the feature combination $$\\texttt{AGE}$$ and $$\\texttt{ABDOMEN}$$ gives us the best trade-off between mean VIF and R-squared/RMSE values.
+        To determine the most significant predictors in our model, we use a combination of **F-tests** and the **Holm-Bonferroni correction**.
+
+        1. **F-Tests for each predictor**: 
+        * For each predictor, we create a reduced model by excluding that variable and compare it to the full model using an Analysis of Variance (**ANOVA**). 
+        * The *F-test* evaluates whether the excluded predictor contributes significantly to explaining the variance in the response variable.
+
+        * The null and alternative hypotheses for the F-test (where $$j$$ is the predictor of interest) are:
+
+        $$
+        H_0: \\beta_{j} = 0
+        $$
+
+        $$
+        H_1: \\beta_{j} \\neq 0
+        $$
+
+        * The *F-statistic* is calculated as:
+        $$
+        F = \\frac{\\left( \\text{SSR}_{\\text{reduced}} - \\text{SSR}_{\\text{full}} \\right) / (p_{\\text{reduced}} - p_{\\text{full}})}{\\text{SSR}_{\\text{full}} / (n - p_{\\text{full}})}
+        $$
+        * where:
+            - $$\\text{SSR}_{\\text{reduced}}$$ is the sum of squared residuals for the reduced model,
+            - $$\\text{SSR}_{\\text{full}}$$ is the sum of squared residuals for the full model,
+            - $$p_{\\text{reduced}}$$ and $$p_{\\text{full}}$$ are the number of parameters (including the intercept) in the reduced and full models,
+            - $$n$$ is the number of observations.
+
+        2. **Holm-Bonferroni Correction**:
+        * To control for the increased risk of Type I errors due to multiple hypothesis testing, we apply the **Holm-Bonferroni correction**.
+        * This method adjusts the significance threshold for each predictor based on the number of comparisons.
+        * The steps of the Holm-Bonferroni correction are:
+            - Sort the p-values from smallest to largest: 
+            $$
+            p_1 \\leq p_2 \\leq \\dots \\leq p_m
+            $$
+            - For each p-value, calculate the adjusted threshold using $$\\alpha$$ (significance level 0.05), $$m$$ (total number of tests), $$i$$ (index of the p-value in the sorted list).
+            $$
+            \\alpha_{\\text{adjusted}} = \\frac{\\alpha}{m - i + 1}
+            $$
+        * Compare each p-value to its corresponding threshold, and reject the null hypothesis if: 
+        $$
+        p_i < \\alpha_{\\text{adjusted}}
+        $$
+
+        3. **Final Selection**:
+        * Predictors are considered significant if their adjusted p-values remain below the corresponding Holm-Bonferroni threshold.
+        * This approach ensures that only the most informative predictors are retained while controlling for false discoveries.
+
+        This procedure helps in refining our model by retaining only the variables that add the most value to predicting the target outcome.
     ''', mathjax=True),
 
-    html.H3("Final features chosen:",
-            style={'text-align': 'left', 'color': '#293241'}),
+        build_best_predictors_table(),
 
-    dcc.Markdown('''
-    As $$\\texttt{ABDOMEN}$$ and $$\\texttt{AGE}$$ are not only the most statistically significant feature according to the holm-bonferroni corrected goodness of fit test, but also is the simplest model that minimizes mean VIF while maximizing R-squared (or minimizing RMSE).
-    Therefore, we now fit a multiple linear regression model with these features.
-''', mathjax=True),
-
-    html.Div([
-        # Previous Page button
-        dcc.Link('Go to Previous Page', href='/third_page.data_cleaning_imputation_description', 
-                 style={
-                    'color': '#ee6c4d',
-                    'fontSize': '20px',
-                    'textDecoration': 'none',
-                    'fontWeight': 'bold',
-                    'padding': '10px',
-                    'border': '2px solid #ee6c4d',
-                    'borderRadius': '10px',
-                    'backgroundColor': '#f7f7f7',
-                    'textAlign': 'center',
-                    'display': 'inline-block',
-                    'transition': 'all 0.3s ease',
-                    'boxShadow': '3px 3px 5px rgba(0, 0, 0, 0.2)'}),
-
-        # Next Page button
-        dcc.Link('Go to Next Page', href='/fifth_page.mlr_description', 
-                 style={
-                    'color': '#ee6c4d',
-                    'fontSize': '20px',
-                    'textDecoration': 'none',
-                    'fontWeight': 'bold',
-                    'padding': '10px',
-                    'border': '2px solid #ee6c4d',
-                    'borderRadius': '10px',
-                    'backgroundColor': '#f7f7f7',
-                    'textAlign': 'center',
-                    'display': 'inline-block',
-                    'transition': 'all 0.3s ease',
-                    'boxShadow': '3px 3px 5px rgba(0, 0, 0, 0.2)'
-        })
-    ], style={'display': 'flex', 'justifyContent': 'space-between', 'padding': '20px'})
-])
+        dcc.Markdown('''
+        We can see that, the features $$\\texttt{AGE}$$ and $$\\texttt{ABDOMEN}$$ are the most significant (or useful) predictors for our multiple linear regression model.
+    ''', mathjax=True),
+
+        html.H3("Feature selection via trade-off analysis of combinations:",
+                style={'text-align': 'left', 'color': '#293241'}),
+
+        dcc.Markdown('''
+        In this alternate feature selection procedure, we evaluate all possible combinations of features to find the optimal subset that maximizes model performance while balancing complexity. The goal is to maximize **R-squared** (explained variance), minimize **RMSE** (prediction error), and reduce **Mean VIF** (multicollinearity).
+
+        Because the test RMSE comes from a single train/test split, the table also reports the **LOOCV RMSE**, the leave-one-out cross-validated RMSE on the training set, computed in closed form from the PRESS residuals $$e_i / (1 - h_{ii})$$ without refitting any model.
+
+        We prioritize parsimony by excluding features that add little to the model's performance. When additional features do not substantially improve R-squared or reduce RMSE, we prefer a simpler model to avoid overfitting.
+
+        The trade-off is to balance model accuracy and interpretability by selecting only those features that contribute meaningfully to the model's predictive power.
+        ''', mathjax=True),
+
+        build_combination_table_layout(),
+
+        dcc.Markdown('''
+        Similar to the ANOVA-Based Stepwise Feature Selection with Holm-Bonferroni Correction, we find that the feature combination $$\\texttt{AGE}$$ and $$\\texttt{ABDOMEN}$$ gives us the best trade-off between mean VIF and R-squared/RMSE values.
+        ''', mathjax=True),
+
+        html.H3("Final features chosen:",
+                style={'text-align': 'left', 'color': '#293241'}),
+
+        dcc.Markdown('''
+        As $$\\texttt{ABDOMEN}$$ and $$\\texttt{AGE}$$ are not only the most statistically significant feature according to the holm-bonferroni corrected goodness of fit test, but also is the simplest model that minimizes mean VIF while maximizing R-squared (or minimizing RMSE).
+        Therefore, we now fit a multiple linear regression model with these features.
+    ''', mathjax=True),
+
+        html.Div([
+            # Previous Page button
+            dcc.Link('Go to Previous Page', href='/third_page.data_cleaning_imputation_description', 
+                     style={
+                        'color': '#ee6c4d',
+                        'fontSize': '20px',
+                        'textDecoration': 'none',
+                        'fontWeight': 'bold',
+                        'padding': '10px',
+                        'border': '2px solid #ee6c4d',
+                        'borderRadius': '10px',
+                        'backgroundColor': '#f7f7f7',
+                        'textAlign': 'center',
+                        'display': 'inline-block',
+                        'transition': 'all 0.3s ease',
+                        'boxShadow': '3px 3px 5px rgba(0, 0, 0, 0.2)'}),
+
+            # Next Page button
+            dcc.Link('Go to Next Page', href='/fifth_page.mlr_description', 
+                     style={
+                        'color': '#ee6c4d',
+                        'fontSize': '20px',
+                        'textDecoration': 'none',
+                        'fontWeight': 'bold',
+                        'padding': '10px',
+                        'border': '2px solid #ee6c4d',
+                        'borderRadius': '10px',
+                        'backgroundColor': '#f7f7f7',
+                        'textAlign': 'center',
+                        'display': 'inline-block',
+                        'transition': 'all 0.3s ease',
+                        'boxShadow': '3px 3px 5px rgba(0, 0, 0, 0.2)'
+            })
+        ], style={'display': 'flex', 'justifyContent': 'space-between', 'padding': '20px'})
+    ])
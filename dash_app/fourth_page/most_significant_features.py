@@ -4,16 +4,18 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 import pandas as pd
+from model.datasets import load_dataset
 import plotly.graph_objects as go
 from dash import html, dcc
 from model.goodness_of_fit import finding_most_significant_features
 from model.prior_bmi_model_based_anomaly_detection import find_anomalies, clean_df
+from model.page_artifacts import page_artifact
 
 
-# Function to create the table layout
-def create_best_predictors_table(X, y, alpha=0.05):
+# Function to create the table figure
+def create_best_predictors_figure(X, y, alpha=0.05):
     """
-    Creates a table layout showing the most significant features and their p-values,
+    Creates a table figure showing the most significant features and their p-values,
     adjusted by the Holm-Bonferroni method.
 
     Parameters:
@@ -22,11 +24,11 @@ def create_best_predictors_table(X, y, alpha=0.05):
     - alpha: Significance level for the Holm-Bonferroni correction (default = 0.05).
 
     Returns:
-    - best_predictors_table_layout: A Dash layout containing the best predictors table.
+    - fig: A Plotly figure containing the best predictors table.
     """
 
     # Finding the most significant features and p-values using Holm-Bonferroni correction
-    significant_features, p_values_df = finding_most_significant_features(X, y, alpha)
+    significant_features, p_values_df = finding_most_significant_features(X, y, alpha, method='single_fit')
 
     # Sample data for predictors and p-values
     table_data = {
@@ -77,26 +79,33 @@ def create_best_predictors_table(X, y, alpha=0.05):
         height=220,  # Set a fixed height for the table
         autosize=False
     )
-    # Dash layout with the table
-    best_predictors_table_layout = html.Div([
-        dcc.Graph(id='most-significant-features-table', 
-                  figure=fig, 
-                  style={'height': '220px'}  # Adjusted height for the table
-                  )
-    ], style={'display': 'flex', 'justify-content': 'center', 
-       'align-items': 'center', 'width': '100%'}  # Center the table
-    )
+    return fig
+
+def best_predictors_figure():
+    """Holm-Bonferroni corrected significance table figure of the cleaned dataset."""
 
-    return best_predictors_table_layout
+    # Load the data
+    cleaned_df = load_dataset('cleaned_bodyfat_11.csv')
 
-# Load the data
-cleaned_df = pd.read_csv('https://raw.githubusercontent.com/Stochastic1017/Body_Fat_Study/refs/heads/main/dataset/cleaned_bodyfat_11.csv')
+    # Seperate features and response
+    X = cleaned_df[["AGE", "ADIPOSITY", "CHEST", "ABDOMEN", "THIGH"]]
+    y = cleaned_df["BODYFAT"]
 
-# Seperate features and response
-X = cleaned_df[["AGE", "ADIPOSITY", "CHEST", "ABDOMEN", "THIGH"]]
-y = cleaned_df["BODYFAT"]
+    return create_best_predictors_figure(X, y)
 
-# Main layout for your Dash app
-best_predictors_table = html.Div([
-    create_best_predictors_table(X, y)
-])
+def build_best_predictors_table():
+    """Holm-Bonferroni corrected significance table, read from the page artifacts when built, on first request."""
+
+    fig = page_artifact('best_predictors_table', best_predictors_figure)
+
+    # Dash layout with the table
+    return html.Div([
+        html.Div([
+            dcc.Graph(id='most-significant-features-table', 
+                      figure=fig, 
+                      style={'height': '220px'}  # Adjusted height for the table
+                      )
+        ], style={'display': 'flex', 'justify-content': 'center', 
+           'align-items': 'center', 'width': '100%'}  # Center the table
+        )
+    ])
@@ -0,0 +1,253 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import hashlib
+import json
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+# Version of the on-disk layout; bump when the manifest or arrays change meaning
+ARTIFACT_VERSION = 1
+
+MANIFEST = 'manifest.json'
+
+# Published model shipped with the app
+DEFAULT_ARTIFACT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    'artifacts', 'bodyfat_mlr')
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                       'dataset', 'cleaned_bodyfat_11.csv')
+
+
+def hash_training_data(X, y):
+    """
+    SHA-256 of the training data (column names, then the values as float64), used
+    to tell whether an artifact was fitted on a given dataset.
+    """
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps(list(X.columns)).encode())
+    digest.update(np.ascontiguousarray(np.asarray(X, dtype=np.float64)).tobytes())
+    digest.update(np.ascontiguousarray(np.asarray(y, dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+def _file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class ModelArtifact:
+    """
+    Fitted linear model loaded from a versioned artifact directory.
+
+    The directory holds a JSON manifest (feature names, scale, degrees of freedom,
+    training-data hash, fit metadata and checksums) and .npy arrays for the
+    coefficients and (X'X)^-1, which are memory-mapped read-only.
+
+    Parameters:
+    ----------
+    manifest : dict
+        Parsed manifest.json.
+    coefficients : np.ndarray
+        Intercept followed by one coefficient per feature.
+    xtx_inv : np.ndarray
+        (X'X)^-1 of the training design matrix with a constant column.
+    """
+
+    def __init__(self, manifest, coefficients, xtx_inv):
+        self.manifest = manifest
+        self.coefficients = coefficients
+        self.xtx_inv = xtx_inv
+
+    @property
+    def features(self):
+        return self.manifest['features']
+
+    @property
+    def response(self):
+        return self.manifest['response']
+
+    @property
+    def intercept(self):
+        return float(self.coefficients[0])
+
+    @property
+    def slopes(self):
+        """Coefficients of the features as a pd.Series."""
+        return pd.Series(np.asarray(self.coefficients[1:]), index=self.features)
+
+    def _design(self, X):
+        # Feature matrix in model order from a DataFrame, a mapping of scalars or
+        # arrays, or an array whose columns are already in model order
+        if isinstance(X, dict):
+            X = pd.DataFrame({name: np.atleast_1d(X[name]) for name in self.features})
+        if isinstance(X, pd.DataFrame):
+            X = X[self.features]
+        return np.atleast_2d(np.asarray(X, dtype=float))
+
+    def predict(self, X):
+        """
+        Predicted response for every row of X.
+
+        Returns:
+        -------
+        y_pred : np.ndarray
+        """
+
+        return self.intercept + self._design(X) @ np.asarray(self.coefficients[1:])
+
+    def prediction_interval(self, X, alpha=0.05):
+        """
+        Prediction intervals y_hat +/- t * sqrt(s^2 (1 + x'(X'X)^-1 x)) for every row of X.
+
+        Returns:
+        -------
+        lower, upper : np.ndarray
+        """
+
+        X = self._design(X)
+        Z = np.column_stack([np.ones(len(X)), X])
+        y_pred = Z @ np.asarray(self.coefficients)
+
+        quad = np.einsum('ij,jk,ik->i', Z, np.asarray(self.xtx_inv), Z)
+        half_width = (stats.t.ppf(1 - alpha / 2, self.manifest['df_resid'])
+                      * np.sqrt(self.manifest['scale'] * (1 + quad)))
+
+        return y_pred - half_width, y_pred + half_width
+
+    def matches_training_data(self, X, y):
+        """True if (X, y) is the data the artifact was fitted on."""
+        return hash_training_data(X[self.features], y) == self.manifest['training_data_sha256']
+
+
+def save_model_artifact(model, X_train, y_train, path=DEFAULT_ARTIFACT_DIR, metadata=None):
+    """
+    Write a fitted statsmodels OLS model as a versioned artifact directory.
+
+    Parameters:
+    ----------
+    model : statsmodels RegressionResults
+        OLS fit with a 'const' column followed by the features.
+    X_train : pd.DataFrame
+        Training features (without the constant).
+    y_train : pd.Series
+        Training response.
+    path : str
+        Output directory (created if needed, files are overwritten).
+    metadata : dict, optional
+        Extra fit metadata stored in the manifest (e.g. how the data was split).
+
+    Returns:
+    -------
+    manifest : dict
+    """
+
+    os.makedirs(path, exist_ok=True)
+
+    arrays = {
+        'coefficients.npy': np.asarray(model.params, dtype=np.float64),
+        'xtx_inv.npy': np.asarray(model.normalized_cov_params, dtype=np.float64)
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(path, name), array)
+
+    manifest = {
+        'artifact_version': ARTIFACT_VERSION,
+        'model': 'ols',
+        'features': list(X_train.columns),
+        'response': y_train.name,
+        'n_obs': int(model.nobs),
+        'df_resid': float(model.df_resid),
+        'scale': float(model.scale),
+        'r_squared': float(model.rsquared),
+        'training_data_sha256': hash_training_data(X_train, y_train),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'metadata': metadata or {},
+        'files': {name: _file_hash(os.path.join(path, name)) for name in arrays}
+    }
+    with open(os.path.join(path, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def load_model_artifact(path=DEFAULT_ARTIFACT_DIR, mmap=True, verify=False):
+    """
+    Load a model artifact written by `save_model_artifact`.
+
+    Parameters:
+    ----------
+    path : str
+        Artifact directory.
+    mmap : bool
+        Memory-map the arrays read-only instead of reading them (default: True).
+    verify : bool
+        Check the arrays against the checksums in the manifest.
+
+    Returns:
+    -------
+    artifact : ModelArtifact
+    """
+
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+
+    if manifest.get('artifact_version') != ARTIFACT_VERSION:
+        raise ValueError(f"Unsupported model artifact version {manifest.get('artifact_version')} "
+                         f"in {path}, expected {ARTIFACT_VERSION}")
+
+    if verify:
+        for name, digest in manifest['files'].items():
+            if _file_hash(os.path.join(path, name)) != digest:
+                raise ValueError(f"Checksum mismatch for {name} in {path}")
+
+    mmap_mode = 'r' if mmap else None
+    coefficients = np.load(os.path.join(path, 'coefficients.npy'), mmap_mode=mmap_mode)
+    xtx_inv = np.load(os.path.join(path, 'xtx_inv.npy'), mmap_mode=mmap_mode)
+
+    return ModelArtifact(manifest, coefficients, xtx_inv)
+
+
+def main():
+    from sklearn.model_selection import train_test_split
+    from model.multiple_regression import run_regression_and_summary
+
+    parser = argparse.ArgumentParser(description='Fit the published body fat model and write it as an artifact.')
+    parser.add_argument('--data', default=DATASET, help='Cleaned dataset (CSV).')
+    parser.add_argument('--output', default=DEFAULT_ARTIFACT_DIR, help='Artifact directory.')
+    parser.add_argument('--features', nargs='+', default=['AGE', 'ABDOMEN'])
+    parser.add_argument('--drop-idno', type=int, nargs='*', default=[39],
+                        help='Observations removed before fitting (outside Cook\'s distance).')
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--random-state', type=int, default=123)
+    args = parser.parse_args()
+
+    # Same data and split as the fifth page
+    df = pd.read_csv(args.data)
+    df = df[~df['IDNO'].isin(args.drop_idno)]
+    X_train, X_test, y_train, y_test = train_test_split(df[args.features], df['BODYFAT'],
+                                                        test_size=args.test_size,
+                                                        random_state=args.random_state)
+
+    results = run_regression_and_summary(X_train, y_train, X_test, y_test)
+
+    manifest = save_model_artifact(results.model, X_train, y_train, args.output, metadata={
+        'dataset': os.path.basename(args.data),
+        'dropped_idno': args.drop_idno,
+        'test_size': args.test_size,
+        'random_state': args.random_state,
+        'rmse_test': float(results.rmse_test)
+    })
+
+    print(f"Wrote {args.output} (version {manifest['artifact_version']}, "
+          f"data {manifest['training_data_sha256'][:12]})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,737 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import heapq
+import itertools
+import math
+from functools import partial
+import numpy as np
+import pandas as pd
+from model.parallel import parallel_map, resolve_n_jobs, split_into_chunks
+from model.vif import correlation_from_gram, subset_mean_vif
+
+
+def compute_gram_statistics(X_train, X_test, y_train, y_test):
+    """
+    Compute the cross-product matrices needed to score every subset of features.
+
+    All matrices are built once from the full feature set. The training data is
+    centered on its own means, so the intercept drops out of the submatrix solves
+    and is recovered afterwards. The test data is centered on the *training* means,
+    which lets the test residual sum of squares be written in terms of X'X and X'y.
+
+    Parameters:
+    ----------
+    X_train, X_test : pd.DataFrame
+        Training and test predictors (same columns).
+    y_train, y_test : pd.Series or np.ndarray
+        Training and test response.
+
+    Returns:
+    -------
+    stats : dict
+        Dictionary holding the feature names, training means, centered training
+        rows and Gram matrix (XtX, Xty, SST), centered test Gram matrix (XtX_test, Xty_test,
+        yty_test), the raw (uncentered) training Gram matrix and its correlation
+        form used for VIF, and the number of training/test observations.
+    """
+
+    feature_names = list(X_train.columns)
+
+    X_tr = np.asarray(X_train, dtype=float)
+    X_te = np.asarray(X_test, dtype=float)
+    y_tr = np.asarray(y_train, dtype=float)
+    y_te = np.asarray(y_test, dtype=float)
+
+    # Training means (the intercept absorbs them)
+    x_mean = X_tr.mean(axis=0)
+    y_mean = y_tr.mean()
+
+    # Center both sets on the training means
+    Xc_tr = X_tr - x_mean
+    yc_tr = y_tr - y_mean
+    Xc_te = X_te - x_mean
+    yc_te = y_te - y_mean
+
+    stats = {
+        'features': feature_names,
+        # Centered training rows, only needed for leave-one-out residuals
+        'Xc_train': Xc_tr,
+        'yc_train': yc_tr,
+        'x_mean': x_mean,
+        'y_mean': y_mean,
+        'n_train': X_tr.shape[0],
+        'n_test': X_te.shape[0],
+        'XtX': Xc_tr.T @ Xc_tr,
+        'Xty': Xc_tr.T @ yc_tr,
+        'SST': yc_tr @ yc_tr,
+        'XtX_test': Xc_te.T @ Xc_te,
+        'Xty_test': Xc_te.T @ yc_te,
+        'yty_test': yc_te @ yc_te,
+        # statsmodels' variance_inflation_factor regresses without a constant,
+        # so the VIFs shown in the table come from the uncentered cross-products
+        'XtX_raw': X_tr.T @ X_tr,
+    }
+    stats['vif_corr'] = correlation_from_gram(stats['XtX_raw'])
+
+    return stats
+
+
+def _inverse(A):
+    # Fall back to the pseudo-inverse (as statsmodels does) for singular subsets
+    try:
+        return np.linalg.inv(A)
+    except np.linalg.LinAlgError:
+        return np.linalg.pinv(A)
+
+
+def _loocv_rmse(Xc_S, yc, beta, XtX_inv):
+    # Leave-one-out (PRESS) RMSE without refitting: e_i / (1 - h_ii), where the
+    # leverage of a centered row is h_ii = 1/n + x_i' (X_S'X_S)^-1 x_i
+    n = len(yc)
+    residuals = yc - Xc_S @ beta
+    leverage = 1 / n + np.einsum('ij,jk,ik->i', Xc_S, XtX_inv, Xc_S)
+    return np.sqrt(np.mean((residuals / (1 - leverage)) ** 2))
+
+
+def _fit_subset(stats, idx):
+    # Returns (intercept, slopes, (X_S'X_S)^-1, training R-squared, test RMSE) for one subset
+    XtX_S = stats['XtX'][np.ix_(idx, idx)]
+    Xty_S = stats['Xty'][idx]
+
+    # Slopes from the centered normal equations
+    XtX_inv = _inverse(XtX_S)
+    beta = XtX_inv @ Xty_S
+    intercept = stats['y_mean'] - stats['x_mean'][idx] @ beta
+
+    # Training SSE = SST - beta'X'y (centered)
+    SSE = stats['SST'] - beta @ Xty_S
+    r_squared = 1 - SSE / stats['SST']
+
+    # Test SSE = y'y - 2 beta'X'y + beta'X'X beta (centered on training means)
+    SSE_test = (stats['yty_test']
+                - 2 * beta @ stats['Xty_test'][idx]
+                + beta @ stats['XtX_test'][np.ix_(idx, idx)] @ beta)
+    rmse = np.sqrt(max(SSE_test, 0.0) / stats['n_test'])
+
+    return intercept, beta, XtX_inv, r_squared, rmse
+
+
+def fit_subset_from_gram(stats, idx):
+    """
+    Fit the least squares model for one subset of features from the shared Gram matrices.
+
+    Parameters:
+    ----------
+    stats : dict
+        Output of `compute_gram_statistics`.
+    idx : sequence of int
+        Column positions (into `stats['features']`) of the features in the subset.
+
+    Returns:
+    -------
+    fit : dict
+        Intercept, coefficients (pd.Series indexed by feature name), training
+        R-squared, test RMSE, mean VIF and leave-one-out RMSE of the subset.
+    """
+
+    idx = list(idx)
+    intercept, beta, XtX_inv, r_squared, rmse = _fit_subset(stats, idx)
+
+    return {
+        'Intercept': intercept,
+        'Coefficients': pd.Series(beta, index=[stats['features'][i] for i in idx]),
+        'R-squared': r_squared,
+        'RMSE': rmse,
+        'Mean VIF': subset_mean_vif(stats['vif_corr'], idx),
+        'LOOCV RMSE': _loocv_rmse(stats['Xc_train'][:, idx], stats['yc_train'], beta, XtX_inv)
+    }
+
+
+def _all_subsets(p):
+    # Every non-empty subset of range(p), in the itertools order used by fit_all_combinations
+    for r in range(1, p + 1):
+        yield from itertools.combinations(range(p), r)
+
+
+def _gram_rows(stats, loocv, subsets):
+    # (subset, R-squared, RMSE, Mean VIF[, LOOCV RMSE]) for each subset, scored
+    # from the Gram matrices
+    rows = []
+    for idx in subsets:
+        _, beta, XtX_inv, r_squared, rmse = _fit_subset(stats, list(idx))
+        row = (idx, r_squared, rmse, subset_mean_vif(stats['vif_corr'], idx))
+        if loocv:
+            row += (_loocv_rmse(stats['Xc_train'][:, idx], stats['yc_train'], beta, XtX_inv),)
+        rows.append(row)
+    return rows
+
+
+def _results_frame(feature_names, rows):
+    # Build the combination table from (subset, R-squared, RMSE, Mean VIF[, LOOCV RMSE])
+    # rows, first putting them in itertools order so that RMSE ties sort as in the
+    # statsmodels loop
+    rows = sorted(rows, key=lambda row: (len(row[0]), row[0]))
+
+    results_df = pd.DataFrame({
+        'Features': [', '.join(feature_names[i] for i in row[0]) for row in rows],
+        'R-squared': [row[1] for row in rows],
+        'RMSE': [row[2] for row in rows],
+        'Mean VIF': [row[3] for row in rows]
+    })
+    if rows and len(rows[0]) > 4:
+        results_df['LOOCV RMSE'] = [row[4] for row in rows]
+
+    # Sort the DataFrame by RMSE from lowest to highest
+    results_df = results_df.sort_values(by='RMSE', ascending=True).reset_index(drop=True)
+
+    return results_df
+
+
+def gram_all_combinations(X_train, X_test, y_train, y_test, n_jobs=1, loocv=False):
+    """
+    Evaluate every non-empty subset of features using one pass over the data.
+
+    Equivalent to the statsmodels loop in `fit_all_combinations`, but X'X and X'y are
+    computed once and every subset is scored from a k x k submatrix solve, so no
+    per-subset DataFrames or model objects are created.
+
+    Parameters:
+    ----------
+    X_train, X_test : pd.DataFrame
+        Training and test predictors.
+    y_train, y_test : pd.Series or np.ndarray
+        Training and test response.
+    n_jobs : int or None
+        Number of worker processes the subsets are split across (default: 1, serial;
+        -1 uses every core).
+    loocv : bool
+        Add a 'LOOCV RMSE' column with the leave-one-out RMSE of every subset on the
+        training set, computed in closed form from the PRESS residuals.
+
+    Returns:
+    -------
+    results_df : pd.DataFrame
+        One row per subset with columns 'Features', 'R-squared', 'RMSE' and
+        'Mean VIF' (and 'LOOCV RMSE'), sorted by RMSE from lowest to highest.
+    """
+
+    stats = compute_gram_statistics(X_train, X_test, y_train, y_test)
+    feature_names = stats['features']
+
+    # A few chunks per worker keeps the pool balanced (larger subsets cost more)
+    n_jobs = resolve_n_jobs(n_jobs)
+    chunks = split_into_chunks(_all_subsets(len(feature_names)), 4 * n_jobs)
+    chunk_rows = parallel_map(partial(_gram_rows, stats, loocv), chunks, n_jobs)
+
+    rows = [row for chunk in chunk_rows for row in chunk]
+
+    return _results_frame(feature_names, rows)
+
+
+def compute_fold_statistics(X, y, n_splits=5, n_repeats=10, random_state=123):
+    """
+    Compute the training and held-out Gram matrices of every fold of a repeated
+    K-fold split.
+
+    The full cross-product matrix of the design [1, X | y] is computed once; each
+    fold's held-out contribution is computed from its own rows, and its training
+    Gram matrix is the full one minus that contribution. The features are centered
+    on their overall means first (the constant absorbs the shift), which keeps the
+    subtraction well conditioned.
+
+    Parameters:
+    ----------
+    X : pd.DataFrame
+        Predictors.
+    y : pd.Series or np.ndarray
+        Response.
+    n_splits : int
+        Number of folds K per repeat (default: 5).
+    n_repeats : int
+        Number of times R the K-fold split is reshuffled (default: 10).
+    random_state : int
+        Seed of the fold assignment.
+
+    Returns:
+    -------
+    folds : dict
+        Feature names, the stacked (R*K, p+2, p+2) training and held-out Gram
+        matrices ('train', 'test') of [1, X, y], and the held-out fold sizes.
+    """
+
+    Z = np.column_stack([np.ones(len(X)),
+                         np.asarray(X, dtype=float) - np.asarray(X, dtype=float).mean(axis=0),
+                         np.asarray(y, dtype=float)])
+    n = len(Z)
+    full = Z.T @ Z
+
+    rng = np.random.default_rng(random_state)
+    test, sizes = [], []
+    for _ in range(n_repeats):
+        # Shuffle once per repeat and cut the permutation into K near-equal folds
+        for fold in np.array_split(rng.permutation(n), n_splits):
+            test.append(Z[fold].T @ Z[fold])
+            sizes.append(len(fold))
+
+    test = np.array(test)
+
+    return {
+        'features': list(X.columns),
+        'train': full[None, :, :] - test,
+        'test': test,
+        'n_test': np.array(sizes)
+    }
+
+
+def _cv_rows(folds, subsets):
+    # (subset, mean CV RMSE, std CV RMSE) for each subset, every fold solved in one
+    # stacked call
+    y = len(folds['features']) + 1
+    rows = []
+    for idx in subsets:
+        cols = [0] + [i + 1 for i in idx]
+        G = folds['train'][:, cols][:, :, cols]
+        g = folds['train'][:, cols, y]
+        try:
+            beta = np.linalg.solve(G, g[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            beta = np.einsum('fij,fj->fi', np.linalg.pinv(G), g)
+
+        # Held-out SSE = y'y - 2 beta'Z'y + beta'Z'Z beta per fold
+        H = folds['test'][:, cols][:, :, cols]
+        SSE = (folds['test'][:, y, y]
+               - 2 * np.einsum('fi,fi->f', beta, folds['test'][:, cols, y])
+               + np.einsum('fi,fij,fj->f', beta, H, beta))
+        rmse = np.sqrt(np.maximum(SSE, 0.0) / folds['n_test'])
+
+        rows.append((idx, rmse.mean(), rmse.std(ddof=1) if len(rmse) > 1 else np.nan))
+    return rows
+
+
+def cross_validate_combinations(X, y, n_splits=5, n_repeats=10, random_state=123, n_jobs=1):
+    """
+    Repeated K-fold cross-validated RMSE of every non-empty subset of features.
+
+    The per-fold Gram matrices are computed once (see `compute_fold_statistics`) and
+    shared by all subsets, so the cost over a single split is one extra batched
+    solve per subset rather than R*K refits.
+
+    Parameters:
+    ----------
+    X : pd.DataFrame
+        Predictors.
+    y : pd.Series or np.ndarray
+        Response.
+    n_splits, n_repeats : int
+        K folds, reshuffled R times (default: 5 x 10).
+    random_state : int
+        Seed of the fold assignment.
+    n_jobs : int or None
+        Number of worker processes the subsets are split across (default: 1, serial).
+
+    Returns:
+    -------
+    cv_df : pd.DataFrame
+        One row per subset with columns 'Features', 'CV RMSE' (mean over the R*K
+        folds) and 'CV RMSE (std)', in itertools order.
+    """
+
+    folds = compute_fold_statistics(X, y, n_splits, n_repeats, random_state)
+    feature_names = folds['features']
+
+    n_jobs = resolve_n_jobs(n_jobs)
+    chunks = split_into_chunks(_all_subsets(len(feature_names)), 4 * n_jobs)
+    rows = [row for chunk in parallel_map(partial(_cv_rows, folds), chunks, n_jobs) for row in chunk]
+
+    return pd.DataFrame({
+        'Features': [', '.join(feature_names[i] for i in row[0]) for row in rows],
+        'CV RMSE': [row[1] for row in rows],
+        'CV RMSE (std)': [row[2] for row in rows]
+    })
+
+
+def sweep(A, k, inverse=False):
+    """
+    Apply the (symmetric) sweep operator to matrix A on pivot k, in place.
+
+    Sweeping the augmented matrix [[X'X, X'y], [y'X, y'y]] on a set of pivots S leaves
+    -(X_S'X_S)^-1 in the S x S block, the least squares coefficients in the last
+    column and the residual sum of squares in the bottom-right corner. Sweeps
+    commute, and `inverse=True` undoes a previous sweep on the same pivot.
+
+    Parameters:
+    ----------
+    A : np.ndarray
+        Square symmetric matrix, modified in place.
+    k : int
+        Pivot index.
+    inverse : bool
+        Apply the reverse sweep (remove pivot k from the model).
+
+    Returns:
+    -------
+    A : np.ndarray
+        The swept matrix (same object as the input).
+    """
+
+    d = A[k, k]
+    row = A[k] / d
+
+    # a_ij <- a_ij - a_ik * a_kj / a_kk
+    A -= A[:, k, None] * row
+
+    # a_ik, a_kj <- +/- a_ik / a_kk and a_kk <- -1 / a_kk
+    if inverse:
+        row = -row
+    A[k, :] = row
+    A[:, k] = row
+    A[k, k] = -1.0 / d
+
+    return A
+
+
+def _gray_code_flips(p):
+    # Position of the bit that changes between consecutive Gray codes g(i-1) -> g(i)
+    for i in range(1, 2 ** p):
+        yield (i & -i).bit_length() - 1
+
+
+def _sweep_matrix(stats):
+    # Augmented Gram matrix [[X'X, X'y, z], [y'X, y'y, 0], [z', 0, 0]] scaled to
+    # correlation form for well-conditioned pivots. The extra row/column
+    # z = sqrt(n) * mean lets the uncentered inverse needed for VIF be recovered from
+    # the centered one (Sherman-Morrison) without sweeping the badly conditioned
+    # uncentered X'X itself.
+    p = len(stats['features'])
+    scale = np.sqrt(np.diag(stats['XtX']))
+    z = np.sqrt(stats['n_train']) * stats['x_mean'] / scale
+
+    A = np.zeros((p + 2, p + 2))
+    A[:p, :p] = stats['XtX'] / np.outer(scale, scale)
+    A[:p, p] = A[p, :p] = stats['Xty'] / scale
+    A[p, p] = stats['SST']
+    A[:p, p + 1] = A[p + 1, :p] = z
+
+    return A, scale, z
+
+
+def _gray_code_rows(stats, tol, loocv, task):
+    # Score every non-empty subset made of the `fixed` features plus any subset of the
+    # `free` features, walking the free ones in Gray-code order
+    fixed, free = task
+    p = len(stats['features'])
+    A, scale, z = _sweep_matrix(stats)
+
+    XtX_test = stats['XtX_test'] / np.outer(scale, scale)
+    Xty_test = stats['Xty_test'] / scale
+    raw_diag = np.diag(stats['XtX_raw'])
+    Xs_train = stats['Xc_train'] / scale
+
+    in_model = np.zeros(p, dtype=bool)
+
+    def toggle(k):
+        if in_model[k]:
+            sweep(A, k, inverse=True)
+            in_model[k] = False
+        else:
+            if A[k, k] < tol:
+                raise np.linalg.LinAlgError(f"Pivot {k} is below the tolerance")
+            sweep(A, k)
+            in_model[k] = True
+
+    def score():
+        idx = np.flatnonzero(in_model)
+        size = len(idx)
+
+        # Coefficients (on the scaled features, zero outside the model) and
+        # training SSE read off the swept matrix
+        beta = np.where(in_model, A[:p, p], 0.0)
+        SSE = A[p, p]
+        r_squared = 1 - SSE / stats['SST']
+
+        # Test SSE from the test cross-products
+        SSE_test = stats['yty_test'] - 2 * beta @ Xty_test + beta @ XtX_test @ beta
+        rmse = np.sqrt(max(SSE_test, 0.0) / stats['n_test'])
+
+        if size > 1:
+            # (X_S'X_S)^-1 = C^-1 - C^-1 z z' C^-1 / (1 + z'C^-1 z), with C^-1 = -A[S, S]
+            u = A[idx, p + 1]
+            inv_diag = -A.diagonal()[idx] - u ** 2 / (1 + z[idx] @ u)
+            mean_vif = np.sum(raw_diag[idx] * inv_diag / scale[idx] ** 2) / size
+        else:
+            mean_vif = np.nan
+
+        row = (tuple(idx.tolist()), r_squared, rmse, mean_vif)
+        if loocv:
+            # On the scaled features (X_S'X_S)^-1 = -A[S, S]
+            row += (_loocv_rmse(Xs_train[:, idx], stats['yc_train'], A[idx, p],
+                                -A[np.ix_(idx, idx)]),)
+        return row
+
+    rows = []
+
+    for k in fixed:
+        toggle(k)
+    if fixed:
+        rows.append(score())
+
+    for j in _gray_code_flips(len(free)):
+        toggle(free[j])
+        rows.append(score())
+
+    return rows
+
+
+def gray_code_all_combinations(X_train, X_test, y_train, y_test, tol=1e-10, n_jobs=1, loocv=False):
+    """
+    Evaluate every non-empty subset of features by walking them in Gray-code order.
+
+    Consecutive Gray codes differ by exactly one feature, so each subset is obtained
+    from the previous one with a single O(p^2) sweep (feature added) or reverse sweep
+    (feature removed) of the augmented Gram matrix rather than a fresh O(k^3) solve.
+
+    Parameters:
+    ----------
+    X_train, X_test : pd.DataFrame
+        Training and test predictors.
+    y_train, y_test : pd.Series or np.ndarray
+        Training and test response.
+    tol : float
+        Smallest pivot (1 - R-squared of a feature on the features already in the
+        model, on the correlation scale) accepted by the sweep. If a pivot falls below
+        it the features are (nearly) collinear and the search falls back to
+        `gram_all_combinations`.
+    n_jobs : int or None
+        Number of worker processes (default: 1, serial; -1 uses every core). The
+        subsets are split on the membership of the last few features, and each worker
+        walks the Gray code of the remaining features.
+    loocv : bool
+        Add the closed-form leave-one-out 'LOOCV RMSE' column.
+
+    Returns:
+    -------
+    results_df : pd.DataFrame
+        Same schema and ordering as `fit_all_combinations`.
+    """
+
+    stats = compute_gram_statistics(X_train, X_test, y_train, y_test)
+    feature_names = stats['features']
+    p = len(feature_names)
+
+    # 2^m chunks, one per combination of the last m features (about 4 per worker)
+    n_jobs = resolve_n_jobs(n_jobs)
+    m = min(p - 1, math.ceil(math.log2(4 * n_jobs))) if n_jobs > 1 else 0
+    free = list(range(p - m))
+    tasks = [([p - m + j for j in range(m) if mask >> j & 1], free) for mask in range(2 ** m)]
+
+    try:
+        chunk_rows = parallel_map(partial(_gray_code_rows, stats, tol, loocv), tasks, n_jobs)
+    except np.linalg.LinAlgError:
+        return gram_all_combinations(X_train, X_test, y_train, y_test, n_jobs=n_jobs, loocv=loocv)
+
+    rows = [row for chunk in chunk_rows for row in chunk]
+
+    return _results_frame(feature_names, rows)
+
+
+_PAIR_INDICES = {}
+
+
+def _pair_indices(r):
+    # Upper-triangle index pairs (i < j) of an r x r matrix, cached per r
+    if r not in _PAIR_INDICES:
+        _PAIR_INDICES[r] = np.triu_indices(r, 1)
+    return _PAIR_INDICES[r]
+
+
+def branch_and_bound_subsets(X_train, X_test, y_train, y_test, top_k=5, max_size=None, tol=1e-10,
+                             loocv=False):
+    """
+    Find the `top_k` subsets of each size with the smallest training RSS using a
+    Furnival-Wilson (leaps-and-bounds) search, then score them on the test set.
+
+    Every node of the search stands for the subsets between a kept set F and a model
+    S: the inverse tree drops features from S (one reverse sweep of the augmented Gram
+    matrix per node) and the paired regression tree adds features to F (one forward
+    sweep). Because RSS can only grow when features are dropped, RSS(S) bounds every
+    subset of the node from below. That bound is weak for the subsets much smaller
+    than S, so the regression side scores those exactly instead: the subsets of F plus
+    at most two features come straight off the matrix swept on F. A subtree is then
+    entered only while its bound can beat the k-th best RSS of a size the regression
+    side has not covered. Children are ordered so that the features whose removal
+    costs the most RSS head the largest subtrees, and those subtrees are visited
+    last, once good subsets have tightened the thresholds.
+
+    Parameters:
+    ----------
+    X_train, X_test : pd.DataFrame
+        Training and test predictors.
+    y_train, y_test : pd.Series or np.ndarray
+        Training and test response.
+    top_k : int
+        Number of subsets to keep for every subset size (default: 5).
+    max_size : int, optional
+        Largest subset size to report (default: all features).
+    tol : float
+        Smallest pivot accepted when sweeping the full model on the correlation scale.
+    loocv : bool
+        Add the closed-form leave-one-out 'LOOCV RMSE' column.
+
+    Returns:
+    -------
+    results_df : pd.DataFrame
+        One row per retained subset with columns 'Features', 'R-squared', 'RMSE' and
+        'Mean VIF' (and 'LOOCV RMSE'), sorted by RMSE from lowest to highest.
+    """
+
+    if top_k < 1:
+        raise ValueError(f"top_k must be at least 1, got {top_k}")
+
+    stats = compute_gram_statistics(X_train, X_test, y_train, y_test)
+    feature_names = stats['features']
+    p = len(feature_names)
+    max_size = p if max_size is None else min(max_size, p)
+
+    # Augmented, correlation-scaled Gram matrix with no feature swept in (the
+    # regression tree starts from it) and with every feature swept in (the inverse tree)
+    A_empty, _, _ = _sweep_matrix(stats)
+    A = A_empty.copy()
+
+    for k in range(p):
+        if A[k, k] < tol:
+            raise ValueError(f"Feature '{feature_names[k]}' is (nearly) a linear combination "
+                             "of the preceding features; drop it before running the search")
+        sweep(A, k)
+
+    # Max-heaps (stored as negated RSS) holding the best subsets of each size as
+    # bitmasks, and the RSS a subset of each size has to beat to enter its heap.
+    # Sizes outside 1..max_size get -inf, so they never keep a subtree alive.
+    best = {size: [] for size in range(1, max_size + 1)}
+    in_heap = {size: set() for size in best}
+    threshold = [np.inf if 1 <= size <= max_size else -np.inf for size in range(p + 3)]
+
+    def record(subset, size, rss):
+        # Subsets reachable both ways (e.g. S minus one feature = F plus one) are
+        # scored twice, but enter the heap once
+        if rss >= threshold[size] or subset in in_heap[size]:
+            return
+        heap = best[size]
+        if len(heap) < top_k:
+            heapq.heappush(heap, (-rss, subset))
+        else:
+            _, dropped = heapq.heapreplace(heap, (-rss, subset))
+            in_heap[size].discard(dropped)
+        in_heap[size].add(subset)
+        if len(heap) == top_k:
+            threshold[size] = -heap[0][0]
+
+    def can_improve(bound, lo, hi):
+        # Whether a subset of some size in lo..hi with RSS >= bound can still enter its heap
+        return lo <= hi and bound < max(threshold[lo:hi + 1])
+
+    def score_smallest(A_F, F, n_F, addable, bound, first_new):
+        # Regression tree side: score F, F + j and F + {i, j} for i, j in `addable` from
+        # the matrix swept on F. Adding j removes a_j^2 / m_jj from RSS(F), adding {i, j}
+        # the quadratic form of their 2 x 2 block. `bound` is a lower bound of all these
+        # RSS values and sizes below `first_new` were scored by an ancestor.
+        rss = A_F[p, p]
+        if n_F >= first_new:
+            record(F, n_F, rss)
+        if not addable:
+            return
+
+        idx = np.array(addable)
+        a = A_F[idx, p]
+        m = A_F[idx, idx]
+
+        if n_F + 1 >= first_new and bound < threshold[n_F + 1]:
+            single = rss - a ** 2 / m
+            for q in np.flatnonzero(single < threshold[n_F + 1]).tolist():
+                record(F | 1 << addable[q], n_F + 1, single[q])
+
+        if len(addable) >= 2 and n_F + 2 >= first_new and bound < threshold[n_F + 2]:
+            i, j = _pair_indices(len(addable))
+            m_ij = A_F[idx[i], idx[j]]
+            pair = rss - (a[i] ** 2 * m[j] - 2 * a[i] * a[j] * m_ij + a[j] ** 2 * m[i]) / (m[i] * m[j] - m_ij ** 2)
+            for q in np.flatnonzero(pair < threshold[n_F + 2]).tolist():
+                record(F | 1 << addable[i[q]] | 1 << addable[j[q]], n_F + 2, pair[q])
+
+    def search(A_S, A_F, S, F, n_F, droppable):
+        # Node for the subsets between F and S (bitmasks swept into A_F and A_S), with
+        # `droppable` = S - F. S itself and every subset of F plus at most two features
+        # have already been scored.
+        s = n_F + len(droppable)
+        idx = np.array(droppable)
+
+        # Exact RSS of S minus each feature: dropping j adds beta_j^2 / [(X'X)^-1]_jj
+        increase = A_S[idx, p] ** 2 / -A_S[idx, idx]
+        order = np.argsort(-increase)
+        children = idx[order].tolist()
+        child_rss = (A_S[p, p] + increase[order]).tolist()
+        for feature, rss in zip(children, child_rss):
+            record(S & ~(1 << feature), s - 1, rss)
+
+        # Child k drops children[k], keeps children[:k] and may still drop
+        # children[k + 1:], so it covers the subsets between F_k = F + children[:k] and
+        # S - children[k], all bounded by child_rss[k]. F_k is built by sweeping
+        # children[0], children[1], ... into A_F in turn, and the subsets of F_k plus at
+        # most two features are scored on the way; the child itself is only entered
+        # for the sizes above those.
+        loosest = list(itertools.accumulate(reversed(threshold[:s]), max))[::-1]
+        last = -1
+        for k in reversed(range(len(children))):
+            lo = n_F + max(k, 3)
+            if lo <= s - 1 and child_rss[k] < loosest[lo]:
+                last = k
+                break
+
+        A_k, F_k, entered = A_F, F, []
+        for k in range(last + 1):
+            n_k = n_F + k
+            if can_improve(child_rss[k], max(n_k, n_F + 3), min(n_k + 2, s - 1)):
+                score_smallest(A_k, F_k, n_k, children[k + 1:], child_rss[k], n_F + 3)
+            if can_improve(child_rss[k], n_k + 3, s - 2):
+                entered.append((k, A_k, F_k))
+            if k < last:
+                A_k = sweep(A_k.copy(), children[k])
+                F_k |= 1 << children[k]
+
+        # Visit the small, cheap-to-drop subtrees first so the heaps fill with good
+        # subsets before the large subtrees (which dropped important features) are tested
+        for k, A_k, F_k in reversed(entered):
+            if not can_improve(child_rss[k], n_F + k + 3, s - 2):
+                continue
+            feature = children[k]
+            search(sweep(A_S.copy(), feature, inverse=True), A_k,
+                   S & ~(1 << feature), F_k, n_F + k, children[k + 1:])
+
+    full = (1 << p) - 1
+    record(full, p, A[p, p])
+    score_smallest(A_empty, 0, 0, list(range(p)), A[p, p], 1)
+    search(A, A_empty, full, 0, 0, list(range(p)))
+
+    # Score the retained subsets on the test set
+    results = []
+    for size in sorted(best):
+        for _, mask in sorted(best[size], reverse=True):
+            subset = [i for i in range(p) if mask >> i & 1]
+            fit = fit_subset_from_gram(stats, subset)
+            row = {
+                'Features': ', '.join(feature_names[i] for i in subset),
+                'R-squared': fit['R-squared'],
+                'RMSE': fit['RMSE'],
+                'Mean VIF': fit['Mean VIF']
+            }
+            if loocv:
+                row['LOOCV RMSE'] = fit['LOOCV RMSE']
+            results.append(row)
+
+    # Create a DataFrame from the results
+    results_df = pd.DataFrame(results)
+
+    # Sort the DataFrame by RMSE from lowest to highest
+    results_df = results_df.sort_values(by='RMSE', ascending=True).reset_index(drop=True)
+
+    return results_df
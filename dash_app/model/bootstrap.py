@@ -0,0 +1,202 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from model.memoize import disk_memoize
+
+
+def bootstrap_indices(n, n_boot, rng):
+    """
+    Draw `n_boot` bootstrap resamples of `n` rows as an (n_boot, n) index matrix.
+    """
+
+    return rng.integers(0, n, size=(n_boot, n))
+
+
+def _resample_counts(indices, n):
+    # Row i of the result counts how often each observation appears in resample i
+    n_boot = indices.shape[0]
+    offsets = (indices + n * np.arange(n_boot)[:, None]).ravel()
+    return np.bincount(offsets, minlength=n_boot * n).reshape(n_boot, n)
+
+
+def _batched_solve(G, h):
+    # Solve the stacked normal equations G_b beta_b = h_b, falling back to the
+    # pseudo-inverse only if some resample is singular
+    try:
+        return np.linalg.solve(G, h[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        return np.einsum('bij,bj->bi', np.linalg.pinv(G), h)
+
+
+def bootstrap_gram(X, y, n_boot=10_000, seed=123, block_size=2_000):
+    """
+    Cross-product matrices of the design [1, X] for every bootstrap resample.
+
+    Resample b weights each observation by the number of times it was drawn, so
+    Z'Z and Z'y of all resamples come from batched matrix products over the index
+    matrix instead of n_boot separate fits. The features are centered on their
+    full-sample means first (the intercept absorbs the shift).
+
+    Parameters:
+    ----------
+    X : pd.DataFrame
+        Predictors.
+    y : pd.Series or np.ndarray
+        Response.
+    n_boot : int
+        Number of bootstrap resamples (default: 10,000).
+    seed : int
+        Seed of the random generator.
+    block_size : int
+        Resamples processed at a time, bounding memory to block_size x n weights.
+
+    Returns:
+    -------
+    gram : dict
+        'ZtZ' (n_boot, p+1, p+1) and 'Zty' (n_boot, p+1) stacked cross-products,
+        'x_mean' used for centering and the feature names.
+    """
+
+    X_values = np.asarray(X, dtype=float)
+    y_values = np.asarray(y, dtype=float)
+    n, p = X_values.shape
+
+    x_mean = X_values.mean(axis=0)
+    Z = np.column_stack([np.ones(n), X_values - x_mean])
+
+    rng = np.random.default_rng(seed)
+    ZtZ = np.empty((n_boot, p + 1, p + 1))
+    Zty = np.empty((n_boot, p + 1))
+
+    for start in range(0, n_boot, block_size):
+        stop = min(start + block_size, n_boot)
+        counts = _resample_counts(bootstrap_indices(n, stop - start, rng), n)
+
+        # Z' diag(w_b) Z and Z' diag(w_b) y for the whole block at once
+        WZ = counts[:, :, None] * Z
+        ZtZ[start:stop] = np.einsum('bni,nj->bij', WZ, Z)
+        Zty[start:stop] = np.einsum('bni,n->bi', WZ, y_values)
+
+    return {'ZtZ': ZtZ, 'Zty': Zty, 'x_mean': x_mean, 'features': list(X.columns)}
+
+
+def _coefficients_from_gram(gram, idx=None):
+    # Intercept and slopes (on the original scale) of every resample, for the
+    # features at positions `idx` (default: all)
+    p = len(gram['features'])
+    idx = list(range(p)) if idx is None else list(idx)
+    cols = [0] + [i + 1 for i in idx]
+
+    beta = _batched_solve(gram['ZtZ'][:, cols][:, :, cols], gram['Zty'][:, cols])
+
+    # Undo the centering of the features
+    beta[:, 0] -= beta[:, 1:] @ gram['x_mean'][idx]
+    return beta
+
+
+def _rmse_draws(beta, X_test, y_test):
+    # Test RMSE of every resample's model, beta is (n_boot, k + 1)
+    X_test = np.column_stack([np.ones(len(X_test)), np.asarray(X_test, dtype=float)])
+    residuals = np.asarray(y_test, dtype=float)[None, :] - beta @ X_test.T
+    return np.sqrt(np.mean(residuals ** 2, axis=1))
+
+
+def percentile_intervals(draws, alpha=0.05):
+    """
+    Percentile bootstrap confidence intervals of every column of `draws`.
+
+    Returns:
+    -------
+    intervals : pd.DataFrame
+        'CI Lower' and 'CI Upper' for each column.
+    """
+
+    lower, upper = np.percentile(np.asarray(draws), [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=0)
+    columns = draws.columns if isinstance(draws, pd.DataFrame) else None
+    return pd.DataFrame({'CI Lower': lower, 'CI Upper': upper}, index=columns)
+
+
+@disk_memoize
+def bootstrap_regression(X_train, y_train, X_test=None, y_test=None, n_boot=10_000, alpha=0.05, seed=123):
+    """
+    Percentile bootstrap confidence intervals of the regression coefficients and,
+    when a test set is given, of the test RMSE.
+
+    Parameters:
+    ----------
+    X_train : pd.DataFrame
+        Training predictors.
+    y_train : pd.Series or np.ndarray
+        Training response.
+    X_test, y_test : optional
+        Test set on which each bootstrap model's RMSE is evaluated.
+    n_boot : int
+        Number of bootstrap resamples (default: 10,000).
+    alpha : float
+        The intervals cover 1 - alpha (default: 0.05).
+    seed : int
+        Seed of the random generator.
+
+    Returns:
+    -------
+    intervals : pd.DataFrame
+        Rows 'Intercept', one per feature and 'RMSE (Test set)' (if a test set is
+        given), with the full-sample 'Estimate', 'CI Lower' and 'CI Upper'.
+    """
+
+    features = list(X_train.columns)
+    gram = bootstrap_gram(X_train, y_train, n_boot=n_boot, seed=seed)
+    beta = _coefficients_from_gram(gram)
+
+    draws = pd.DataFrame(beta, columns=['Intercept'] + features)
+
+    # Full-sample estimates
+    X_full = np.column_stack([np.ones(len(X_train)), np.asarray(X_train, dtype=float)])
+    estimate, *_ = np.linalg.lstsq(X_full, np.asarray(y_train, dtype=float), rcond=None)
+    estimates = list(estimate)
+
+    if X_test is not None:
+        draws['RMSE (Test set)'] = _rmse_draws(beta, X_test, y_test)
+        estimates.append(_rmse_draws(estimate[None, :], X_test, y_test)[0])
+
+    intervals = percentile_intervals(draws, alpha)
+    intervals.insert(0, 'Estimate', estimates)
+
+    return intervals
+
+
+def bootstrap_subset_table(results_df, X_train, X_test, y_train, y_test, n_boot=2_000, alpha=0.05, seed=123):
+    """
+    Add percentile bootstrap confidence intervals of the test RMSE to every row of
+    a combination table from `fit_all_combinations`.
+
+    The stacked bootstrap Gram matrices are computed once for all features, and
+    every subset is fitted for all resamples with one batched solve of its
+    submatrices.
+
+    Returns:
+    -------
+    results_df : pd.DataFrame
+        Copy of the table with 'RMSE CI Lower' and 'RMSE CI Upper' columns.
+    """
+
+    features = list(X_train.columns)
+    gram = bootstrap_gram(X_train, y_train, n_boot=n_boot, seed=seed)
+
+    lower, upper = [], []
+    for subset in results_df['Features']:
+        idx = [features.index(name) for name in subset.split(', ')]
+        beta = _coefficients_from_gram(gram, idx)
+        rmse = _rmse_draws(beta, X_test.iloc[:, idx], y_test)
+        lo, hi = np.percentile(rmse, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+        lower.append(lo)
+        upper.append(hi)
+
+    results_df = results_df.copy()
+    results_df['RMSE CI Lower'] = lower
+    results_df['RMSE CI Upper'] = upper
+
+    return results_df
@@ -0,0 +1,325 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import hashlib
+import json
+import shutil
+import tempfile
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+REPOSITORY_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Datasets shipped with the repository
+DATASET_DIR = os.environ.get('BODYFAT_DATASET_DIR', os.path.join(REPOSITORY_DIR, 'dataset'))
+
+# Columnar copies of the datasets (one .npy file per column), keyed on the CSV's content hash
+CACHE_DIR = os.environ.get('BODYFAT_CACHE_DIR', os.path.join(REPOSITORY_DIR, '.cache', 'datasets'))
+
+# Version of the cache layout; bump when the manifest or the stored dtypes change meaning
+CACHE_VERSION = 1
+
+# Published copies, only read when a file is missing locally and remote loading is allowed
+REMOTE_BASE_URL = 'https://raw.githubusercontent.com/Stochastic1017/Body_Fat_Study/refs/heads/main/dataset/'
+
+DATASETS = ('BodyFat.csv', 'cleaned_bodyfat.csv', 'cleaned_bodyfat_11.csv')
+
+_frames = {}
+_lock = threading.Lock()
+
+
+def _remote_allowed():
+    return os.environ.get('BODYFAT_ALLOW_REMOTE_DATASETS', '0') == '1'
+
+
+def dataset_path(name):
+    """Local path of a dataset file."""
+    return os.path.join(DATASET_DIR, name)
+
+
+def _read_only(df):
+    # Rebuild the frame on non-writeable column arrays so that in-place edits by a
+    # consumer raise instead of silently changing every other page's data
+    columns = {}
+    for column in df.columns:
+        values = df[column].to_numpy(copy=True)
+        values.flags.writeable = False
+        columns[column] = values
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def _cache_enabled():
+    return os.environ.get('BODYFAT_DATASET_CACHE', '1') != '0'
+
+
+def _float32_enabled():
+    return os.environ.get('BODYFAT_DATASET_FLOAT32', '0') == '1'
+
+
+def file_sha256(path, block_size=1 << 20):
+    """SHA-256 of a file's contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_json(path, content):
+    # Write to a temporary file first so that readers never see a partial file
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(content, f, indent=2)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+def _source_hash(path, cache_dir):
+    # Hashing a large CSV costs a full read, so the last hash is reused while the
+    # file's size and modification time are unchanged
+    stat = os.stat(path)
+    pointer = os.path.join(cache_dir, os.path.basename(path) + '.json')
+    try:
+        with open(pointer) as f:
+            entry = json.load(f)
+        if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['sha256']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    digest = file_sha256(path)
+    _write_json(pointer, {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest})
+    return digest
+
+
+def dataset_sha256(name):
+    """
+    SHA-256 of a local dataset file, reusing the hash recorded in the cache while
+    the file's size and modification time are unchanged.
+    """
+
+    path = dataset_path(name)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        return _source_hash(path, CACHE_DIR)
+    except OSError:
+        # No writable cache directory
+        return file_sha256(path)
+
+
+def _column_dtype(values, float32):
+    # Tightest dtype that holds a column exactly (floats optionally as float32)
+    if pd.api.types.is_bool_dtype(values):
+        return 'bool'
+    if pd.api.types.is_integer_dtype(values):
+        info = np.iinfo(np.int32)
+        return 'int32' if values.empty or info.min <= values.min() and values.max() <= info.max else 'int64'
+    if pd.api.types.is_float_dtype(values):
+        return 'float32' if float32 else 'float64'
+    raise ValueError(f"Column {values.name!r} is not numeric and cannot be cached")
+
+
+def _entry_name(name, digest, float32):
+    return f"{name}-{digest[:16]}" + ('-float32' if float32 else '')
+
+
+def build_columnar_cache(path, float32=False, cache_dir=None):
+    """
+    Convert a dataset CSV to its columnar cache entry.
+
+    The entry is a directory named after the file and its content hash, holding one
+    .npy array per column and a JSON manifest. Integer columns (IDNO, AGE) are
+    stored as int32 and measurements as float64, or float32 when requested. Older
+    entries of the same file are removed.
+
+    Parameters:
+    ----------
+    path : str
+        Dataset CSV.
+    float32 : bool
+        Store float columns as float32 (halves the size, at ~7 significant digits).
+    cache_dir : str, optional
+        Cache directory (default: CACHE_DIR).
+
+    Returns:
+    -------
+    entry : str
+        Path of the cache entry.
+    """
+
+    cache_dir = cache_dir or CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+
+    name = os.path.basename(path)
+    digest = _source_hash(path, cache_dir)
+    entry = os.path.join(cache_dir, _entry_name(name, digest, float32))
+    if os.path.exists(os.path.join(entry, 'manifest.json')):
+        return entry
+
+    df = pd.read_csv(path)
+    dtypes = {column: _column_dtype(df[column], float32) for column in df.columns}
+
+    # Build the entry in a temporary directory and rename it into place, so that
+    # concurrent workers either see a complete entry or none
+    tmp = tempfile.mkdtemp(dir=cache_dir, prefix='.tmp-')
+    try:
+        os.chmod(tmp, 0o755)
+        columns = []
+        for i, column in enumerate(df.columns):
+            # Column names such as 'Unnamed: 0' are not safe file names
+            file = f'{i:03d}.npy'
+            np.save(os.path.join(tmp, file), df[column].to_numpy(dtype=dtypes[column]))
+            columns.append({'name': column, 'file': file, 'dtype': dtypes[column]})
+
+        manifest = {
+            'cache_version': CACHE_VERSION,
+            'source': name,
+            'source_sha256': digest,
+            'n_rows': len(df),
+            'float32': float32,
+            'columns': columns
+        }
+        with open(os.path.join(tmp, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        try:
+            os.rename(tmp, entry)
+        except OSError:
+            # Another worker finished the same entry first
+            if not os.path.exists(os.path.join(entry, 'manifest.json')):
+                raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    # Drop entries built from earlier versions of the file
+    for other in os.listdir(cache_dir):
+        if other.startswith(f"{name}-") and not other.startswith(f"{name}-{digest[:16]}"):
+            shutil.rmtree(os.path.join(cache_dir, other), ignore_errors=True)
+
+    return entry
+
+
+def load_columnar_cache(entry):
+    """
+    DataFrame over a cache entry's arrays, memory-mapped read-only: pages are read
+    from disk on first access and shared between worker processes.
+    """
+
+    with open(os.path.join(entry, 'manifest.json')) as f:
+        manifest = json.load(f)
+
+    if manifest.get('cache_version') != CACHE_VERSION:
+        raise ValueError(f"Unsupported dataset cache version {manifest.get('cache_version')} "
+                         f"in {entry}, expected {CACHE_VERSION}")
+
+    columns = {column['name']: np.load(os.path.join(entry, column['file']), mmap_mode='r')
+               for column in manifest['columns']}
+    return pd.DataFrame(columns, copy=False)
+
+
+def read_columnar(path, float32=None, cache_dir=None):
+    """
+    Read a dataset CSV through its columnar cache, converting it on first use.
+
+    Parameters:
+    ----------
+    path : str
+        Dataset CSV.
+    float32 : bool, optional
+        Store float columns as float32 (default: BODYFAT_DATASET_FLOAT32).
+    cache_dir : str, optional
+        Cache directory (default: CACHE_DIR).
+
+    Returns:
+    -------
+    df : pd.DataFrame
+        Read-only, memory-mapped columns.
+    """
+
+    if float32 is None:
+        float32 = _float32_enabled()
+    return load_columnar_cache(build_columnar_cache(path, float32, cache_dir))
+
+
+def _read(name, allow_remote):
+    path = dataset_path(name)
+    if os.path.exists(path):
+        if _cache_enabled():
+            try:
+                return read_columnar(path)
+            except (OSError, ValueError):
+                # Read-only checkout or non-numeric columns: parse the CSV instead
+                pass
+        return _read_only(pd.read_csv(path))
+
+    if allow_remote:
+        return _read_only(pd.read_csv(REMOTE_BASE_URL + name))
+
+    raise FileNotFoundError(f"Dataset {name} not found in {DATASET_DIR}; set BODYFAT_DATASET_DIR, "
+                            f"or BODYFAT_ALLOW_REMOTE_DATASETS=1 to download it from {REMOTE_BASE_URL}")
+
+
+def load_dataset(name, allow_remote=None):
+    """
+    Shared, read-only DataFrame of a body fat dataset.
+
+    Each file is loaded once per process, from the local dataset/ directory
+    (BODYFAT_DATASET_DIR overrides it). Local files go through the columnar cache
+    (see `read_columnar`; BODYFAT_DATASET_CACHE=0 parses the CSV instead). The
+    published copy on GitHub is only used when the file is missing locally and
+    remote loading is enabled, either with `allow_remote=True` or
+    BODYFAT_ALLOW_REMOTE_DATASETS=1.
+
+    Parameters:
+    ----------
+    name : str
+        File name, e.g. 'BodyFat.csv' or 'cleaned_bodyfat_11.csv'.
+    allow_remote : bool, optional
+        Fall back to the GitHub copy (default: BODYFAT_ALLOW_REMOTE_DATASETS).
+
+    Returns:
+    -------
+    df : pd.DataFrame
+        Shallow copy of the cached frame. Adding or dropping columns only affects
+        the copy; the values themselves are read-only and shared by all callers.
+    """
+
+    if allow_remote is None:
+        allow_remote = _remote_allowed()
+
+    with _lock:
+        if name not in _frames:
+            _frames[name] = _read(name, allow_remote)
+        df = _frames[name]
+
+    return df.copy(deep=False)
+
+
+def clear_datasets():
+    """Drop every cached frame (e.g. after the files on disk changed)."""
+    with _lock:
+        _frames.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert the body fat datasets to the columnar cache.')
+    parser.add_argument('names', nargs='*', default=list(DATASETS), help='Dataset files (default: all).')
+    parser.add_argument('--float32', action='store_true', help='Store measurements as float32.')
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    args = parser.parse_args()
+
+    for name in args.names:
+        start = time.perf_counter()
+        entry = build_columnar_cache(dataset_path(name), args.float32, args.cache_dir)
+        elapsed = time.perf_counter() - start
+
+        size = sum(os.path.getsize(os.path.join(entry, file)) for file in os.listdir(entry))
+        print(f"{name}: {os.path.basename(entry)} ({size / 1024:.0f} KiB, {elapsed:.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,11 +4,64 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from scipy.stats import f
+from scipy.linalg import solve_triangular
 import statsmodels.api as sm
 import pandas as pd
 import numpy as np
+from model.memoize import disk_memoize
 
-def general_goodness_of_fit(X, y, alpha=0.05):
+def permutation_f_test(X, y, n_permutations=100_000, seed=123, block_size=10_000):
+    """
+    Permutation p-value of the global F-test (all slopes zero).
+
+    Under the null hypothesis the response is exchangeable, so the F-statistics of
+    the model refitted on permuted responses give its null distribution without
+    assuming normal errors. Permuting y leaves SST unchanged and F is increasing in
+    SSR = ||Q'(y - mean)||^2, where Q is the thin QR basis of the centered
+    predictors. Each block of permuted responses is therefore scored with a single
+    (p x n) @ (n x block) matrix multiply.
+
+    Parameters:
+    ----------
+    X : pd.DataFrame
+        Predictors (without a constant).
+    y : pd.Series or np.ndarray
+        Response.
+    n_permutations : int
+        Number of random permutations (default: 100,000).
+    seed : int
+        Seed of the random generator.
+    block_size : int
+        Permutations scored at a time, bounding memory to n x block_size floats.
+
+    Returns:
+    -------
+    p_value : float
+        (1 + #{permuted SSR >= observed SSR}) / (1 + n_permutations).
+    """
+
+    X_values = np.asarray(X, dtype=float)
+    y_values = np.asarray(y, dtype=float)
+    yc = y_values - y_values.mean()
+
+    Q, _ = np.linalg.qr(X_values - X_values.mean(axis=0))
+    SSR_observed = np.sum((Q.T @ yc) ** 2)
+
+    # Small tolerance so permutations reproducing the observed fit count as ties
+    threshold = SSR_observed * (1 - 1e-12)
+
+    rng = np.random.default_rng(seed)
+    exceed = 0
+    for start in range(0, n_permutations, block_size):
+        size = min(block_size, n_permutations - start)
+        Y = rng.permuted(np.broadcast_to(yc, (size, len(yc))), axis=1)
+        SSR = np.sum((Y @ Q) ** 2, axis=1)
+        exceed += np.count_nonzero(SSR >= threshold)
+
+    return (1 + exceed) / (1 + n_permutations)
+
+@disk_memoize
+def general_goodness_of_fit(X, y, alpha=0.05, n_permutations=None, seed=123):
     
     """
     Perform ANOVA-like goodness of fit test to see if any predictor is useful in the regression model.
@@ -20,11 +73,19 @@ def general_goodness_of_fit(X, y, alpha=0.05):
         Dependent variable (response)
     alpha : float
         Significance level for hypothesis test (default: 0.05)
+    n_permutations : int, optional
+        If set, also compute a permutation p-value from this many permuted responses
+        (see `permutation_f_test`), which does not rely on normal residuals
+    seed : int
+        Seed of the permutations (default: 123)
     
     Returns:
     out : pd.DataFrame
-        Summary DataFrame showing SST, SSE, SSR, F-statistic, p-value, and critical F-value.
+        Summary DataFrame showing SST, SSE, SSR, F-statistic, p-value, and critical F-value
+        (and 'permutation p-value' when n_permutations is set).
     """
+
+    X_predictors = X
     
     # Add a constant to the predictors (intercept term)
     X = sm.add_constant(X)
@@ -68,11 +129,71 @@ def general_goodness_of_fit(X, y, alpha=0.05):
         'p-value': [p_val],
         'F-critical': [F_critical]
     })
+
+    if n_permutations:
+        out['permutation p-value'] = permutation_f_test(X_predictors, y, n_permutations, seed)
     
     return out
 
+def partial_f_tests(X, y, groups=None):
+    """
+    Partial F-tests for dropping each feature (or group of features) from the full
+    model, all derived from a single fit.
+
+    With V = (X'X)^-1 of the full design (with intercept) and s^2 its residual
+    variance, dropping a group G gives F = b_G' (V_GG)^-1 b_G / (q s^2) on (q, n-p-1)
+    degrees of freedom, where q = |G|. For a single feature this is the squared
+    t-statistic b_j^2 / (s^2 V_jj), so no reduced model is ever refitted.
+
+    Parameters:
+    ----------
+    X : pd.DataFrame
+        Predictors (without a constant).
+    y : pd.Series or np.ndarray
+        Response.
+    groups : dict, optional
+        Name -> list of features to drop together. By default every feature is
+        tested on its own.
+
+    Returns:
+    -------
+    tests : pd.DataFrame
+        'Feature' (or group name), 'F-statistic', 'df' and 'p-value', in input order.
+    """
+
+    features = list(X.columns)
+    if groups is None:
+        groups = {feature: [feature] for feature in features}
+
+    design = np.column_stack([np.ones(len(X)), np.asarray(X, dtype=float)])
+    y = np.asarray(y, dtype=float)
+    n, k = design.shape
+
+    # One thin QR gives the coefficients, residual variance and V = R^-1 R^-T
+    Q, R = np.linalg.qr(design)
+    beta = solve_triangular(R, Q.T @ y)
+    df_resid = n - k
+    resid = y - design @ beta
+    s2 = resid @ resid / df_resid
+    R_inv = solve_triangular(R, np.eye(k))
+    V = R_inv @ R_inv.T
+
+    rows = []
+    for name, members in groups.items():
+        idx = [features.index(member) + 1 for member in members]  # skip the intercept
+        b = beta[idx]
+        if len(idx) == 1:
+            F_stat = b[0] ** 2 / (s2 * V[idx[0], idx[0]])
+        else:
+            # Inverse of the group's block of V, the block-inverse form of the drop
+            F_stat = b @ np.linalg.solve(V[np.ix_(idx, idx)], b) / (len(idx) * s2)
+        rows.append((name, F_stat, len(idx), f.sf(F_stat, len(idx), df_resid)))
+
+    return pd.DataFrame(rows, columns=['Feature', 'F-statistic', 'df', 'p-value'])
+
 # Function to create the table layout
-def finding_most_significant_features(X, y, alpha=0.05):
+@disk_memoize
+def finding_most_significant_features(X, y, alpha=0.05, method='anova', groups=None):
     """
     Conducts F-tests to find the most significant features in the model using
     the Holm-Bonferroni method for multiple hypothesis testing.
@@ -85,6 +206,13 @@ def finding_most_significant_features(X, y, alpha=0.05):
         The dependent variable (target) in the regression model.
     alpha : float, optional
         Significance level for hypothesis testing (default is 0.05).
+    method : str, optional
+        'anova' refits a reduced model per feature and compares it to the full model
+        with anova_lm; 'single_fit' derives the same F-tests from the full fit alone
+        (see `partial_f_tests`), which scales to many features.
+    groups : dict, optional
+        Name -> list of features tested (and dropped) together instead of one
+        feature at a time.
 
     Returns:
     -------
@@ -94,28 +222,36 @@ def finding_most_significant_features(X, y, alpha=0.05):
         Sorted p-values of the F-tests conducted for each feature.
     """
 
-    # Add constant to X for intercept
-    X = sm.add_constant(X)
-    
-    # Full model (with all predictors)
-    full_model = sm.OLS(y, X).fit()
-    
-    # List to store p-values for each feature's F-test
-    p_values = []
-
-    # Perform F-test for each predictor (run reduced model by excluding one predictor)
-    for feature in X.columns[1:]:  # Exclude the constant
-        # Create reduced model by excluding current feature
-        reduced_X = X.drop(columns=[feature])
-        reduced_model = sm.OLS(y, reduced_X).fit()
-        
-        # Conduct ANOVA to compare reduced model to full model
-        anova_results = sm.stats.anova_lm(reduced_model, full_model)
-        
-        # Get p-value of F-test (for this feature's inclusion)
-        p_value = anova_results['Pr(>F)'][1]  # Extract the p-value for the full vs reduced comparison
-        p_values.append((feature, p_value))
-    
+    if groups is None:
+        groups = {feature: [feature] for feature in X.columns}
+
+    if method == 'single_fit':
+        p_values = list(partial_f_tests(X, y, groups)[['Feature', 'p-value']].itertuples(index=False, name=None))
+    elif method == 'anova':
+        # Add constant to X for intercept
+        X = sm.add_constant(X)
+
+        # Full model (with all predictors)
+        full_model = sm.OLS(y, X).fit()
+
+        # List to store p-values for each feature's F-test
+        p_values = []
+
+        # Perform F-test for each predictor (run reduced model by excluding one predictor)
+        for feature, members in groups.items():
+            # Create reduced model by excluding current feature
+            reduced_X = X.drop(columns=members)
+            reduced_model = sm.OLS(y, reduced_X).fit()
+
+            # Conduct ANOVA to compare reduced model to full model
+            anova_results = sm.stats.anova_lm(reduced_model, full_model)
+
+            # Get p-value of F-test (for this feature's inclusion)
+            p_value = anova_results['Pr(>F)'][1]  # Extract the p-value for the full vs reduced comparison
+            p_values.append((feature, p_value))
+    else:
+        raise ValueError(f"Unknown method '{method}', expected 'anova' or 'single_fit'")
+
     # Convert p-values list into a DataFrame and sort by p-value
     p_values_df = pd.DataFrame(p_values, columns=['Feature', 'p-value']).sort_values(by='p-value')
 
@@ -0,0 +1,144 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from scipy.linalg import solve_triangular
+
+
+def _orthonormal_basis(exog):
+    # Thin Q of the design matrix. Rank-deficient designs fall back to the left
+    # singular vectors of the non-zero singular values (as statsmodels' pinv does).
+    Q, R = np.linalg.qr(exog, mode='reduced')
+    diag = np.abs(np.diag(R))
+    if diag.min() > diag.max() * max(exog.shape) * np.finfo(float).eps:
+        return Q
+
+    U, s, _ = np.linalg.svd(exog, full_matrices=False)
+    rank = np.sum(s > s.max() * max(exog.shape) * np.finfo(float).eps)
+    return U[:, :rank]
+
+
+def _statistics(leverage, resid, scale, n_params):
+    # Internally studentized residuals and Cook's distance from the leverage
+    standardized = resid / np.sqrt(scale * (1 - leverage))
+    cooks = standardized ** 2 * leverage / (n_params * (1 - leverage))
+    return standardized, cooks
+
+
+def influence_statistics(exog, resid):
+    """
+    Leverage, internally studentized residuals and Cook's distance of an OLS fit,
+    without forming the n x n hat matrix.
+
+    The leverage of row i is the squared norm of row i of Q from a thin QR of the
+    design matrix, which takes O(np^2) time and O(np) memory.
+
+    Parameters:
+    ----------
+    exog : np.ndarray or pd.DataFrame
+        Design matrix of the fit, including the constant column.
+    resid : np.ndarray or pd.Series
+        Residuals of the fit.
+
+    Returns:
+    -------
+    influence : dict
+        'Leverage', 'Standardized Residuals' and 'Cook's Distance', each an array
+        with one value per observation (same values as statsmodels' OLSInfluence).
+    """
+
+    exog = np.asarray(exog, dtype=float)
+    resid = np.asarray(resid, dtype=float)
+    n = exog.shape[0]
+
+    Q = _orthonormal_basis(exog)
+    leverage = np.einsum('ij,ij->i', Q, Q)
+
+    n_params = Q.shape[1]
+    scale = resid @ resid / (n - n_params)
+    standardized, cooks = _statistics(leverage, resid, scale, n_params)
+
+    return {
+        'Leverage': leverage,
+        'Standardized Residuals': standardized,
+        'Cook\'s Distance': cooks
+    }
+
+
+def tsqr_factor(chunks):
+    """
+    R factor of the augmented matrix [X | y] computed one chunk of rows at a time
+    (tall-skinny QR): each chunk's rows are stacked under the running R and
+    re-factored, so memory stays at O(chunk size x p).
+
+    Parameters:
+    ----------
+    chunks : iterable of (X, y)
+        Row chunks of the design matrix (with the constant column) and response.
+
+    Returns:
+    -------
+    R : np.ndarray
+        (p+1) x (p+1) upper triangular factor. R[:p, :p] is the R of X, R[:p, p]
+        is Q'y and R[p, p]^2 is the residual sum of squares.
+    n : int
+        Total number of rows.
+    """
+
+    R, n = None, 0
+    for X, y in chunks:
+        block = np.column_stack([np.asarray(X, dtype=float), np.asarray(y, dtype=float)])
+        if R is not None:
+            block = np.vstack([R, block])
+        R = np.linalg.qr(block, mode='r')
+        n += len(X)
+    return R, n
+
+
+def iter_influence(read_chunks):
+    """
+    Influence statistics of an OLS fit on data that does not fit in memory.
+
+    Two passes over the chunks: the first builds the R factor of [X | y] by TSQR,
+    which gives the coefficients and residual variance; the second computes each
+    row's leverage as ||R^-T x_i||^2 and its studentized residual and Cook's
+    distance.
+
+    Parameters:
+    ----------
+    read_chunks : callable
+        Returns a fresh iterable of (X, y) row chunks every time it is called, with
+        the constant column included in X (e.g. a wrapper around
+        pd.read_csv(..., chunksize=...)).
+
+    Yields:
+    -------
+    influence : pd.DataFrame
+        'Leverage', 'Standardized Residuals' and 'Cook's Distance' of each chunk,
+        indexed like the chunk.
+    """
+
+    R_aug, n = tsqr_factor(read_chunks())
+    p = R_aug.shape[0] - 1
+    R = R_aug[:p, :p]
+
+    beta = solve_triangular(R, R_aug[:p, p])
+    scale = R_aug[p, p] ** 2 / (n - p)
+
+    for X, y in read_chunks():
+        index = X.index if isinstance(X, pd.DataFrame) else None
+        X = np.asarray(X, dtype=float)
+        resid = np.asarray(y, dtype=float) - X @ beta
+
+        # Rows of Q for this chunk: Q_chunk = X_chunk R^-1
+        Q = solve_triangular(R, X.T, trans='T').T
+        leverage = np.einsum('ij,ij->i', Q, Q)
+        standardized, cooks = _statistics(leverage, resid, scale, p)
+
+        yield pd.DataFrame({
+            'Leverage': leverage,
+            'Standardized Residuals': standardized,
+            'Cook\'s Distance': cooks
+        }, index=index)
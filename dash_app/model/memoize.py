@@ -0,0 +1,226 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import functools
+import glob
+import hashlib
+import inspect
+import pickle
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Pickled results, one file per call; shares the git-ignored /.cache/ directory with the dataset cache
+MEMO_DIR = os.environ.get(
+    'BODYFAT_MEMO_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), '.cache', 'memo')
+)
+
+# Size bound of the cache; the least recently used results are evicted past it
+MEMO_MAX_BYTES = int(float(os.environ.get('BODYFAT_MEMO_MAX_MB', 256)) * 2 ** 20)
+
+_code_version = None
+
+
+def memo_enabled():
+    """False when BODYFAT_MEMO=0 (e.g. in benchmarks)."""
+    return os.environ.get('BODYFAT_MEMO', '1') != '0'
+
+
+def code_version():
+    """
+    SHA-256 of every module in model/. Part of every key, so any change to the
+    modelling code invalidates the results computed with the previous version.
+    """
+
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.py'))):
+            digest.update(os.path.basename(path).encode())
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+
+def _update(digest, value):
+    # Feed a value into the hash, tagged with its type so that e.g. 1, 1.0 and '1'
+    # give different keys. Raises TypeError for values without a stable encoding.
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        digest.update(f'{type(value).__name__}:{value!r};'.encode())
+    elif isinstance(value, np.generic):
+        _update(digest, value.item())
+    elif isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            raise TypeError("Object arrays cannot be hashed")
+        digest.update(f'ndarray:{value.dtype.str}:{value.shape};'.encode())
+        digest.update(np.ascontiguousarray(value).reshape(-1).view(np.uint8))
+    elif isinstance(value, pd.Series):
+        digest.update(b'Series;')
+        _update(digest, value.name)
+        _update(digest, value.index)
+        _update(digest, value.to_numpy())
+    elif isinstance(value, pd.DataFrame):
+        digest.update(b'DataFrame;')
+        _update(digest, value.index)
+        _update(digest, list(value.columns))
+        for column in value.columns:
+            _update(digest, value[column].to_numpy())
+    elif isinstance(value, pd.Index):
+        digest.update(b'Index;')
+        values = value.to_numpy()
+        _update(digest, values if not values.dtype.hasobject else [str(v) for v in values])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f'{type(value).__name__}:{len(value)};'.encode())
+        for item in value:
+            _update(digest, item)
+    elif isinstance(value, dict):
+        digest.update(f'dict:{len(value)};'.encode())
+        for key in sorted(value, key=repr):
+            _update(digest, key)
+            _update(digest, value[key])
+    else:
+        raise TypeError(f"Cannot hash argument of type {type(value).__name__}")
+
+
+def call_key(func, arguments):
+    """
+    Hex digest identifying a call: the function, its bound arguments (in signature
+    order, defaults applied) and the code version.
+    """
+
+    digest = hashlib.sha256()
+    digest.update(f'{func.__module__}.{func.__qualname__};'.encode())
+    digest.update(code_version().encode())
+    for name, value in arguments.items():
+        digest.update(name.encode())
+        _update(digest, value)
+    return digest.hexdigest()
+
+
+def _evict(memo_dir, max_bytes):
+    # Delete the least recently used results (hits refresh the mtime) until the
+    # cache fits in max_bytes
+    entries = []
+    for path in glob.glob(os.path.join(memo_dir, '*.pkl')):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+
+def _load(path):
+    try:
+        with open(path, 'rb') as f:
+            value = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return False, None
+
+    # Mark as recently used
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return True, value
+
+
+def _store(path, value, max_bytes):
+    memo_dir = os.path.dirname(path)
+    try:
+        os.makedirs(memo_dir, exist_ok=True)
+        # Write to a temporary file and rename it, so that concurrent workers never
+        # read a partial pickle
+        fd, tmp = tempfile.mkstemp(dir=memo_dir, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    except (OSError, pickle.PicklingError, TypeError, AttributeError):
+        # Read-only checkout or unpicklable result: the result is just not cached
+        return
+    _evict(memo_dir, max_bytes)
+
+
+def disk_memoize(func=None, ignore=(), memo_dir=None, max_bytes=None):
+    """
+    Cache a function's results on disk, keyed by a hash of its arguments and of the
+    model/ code.
+
+    Array, DataFrame and Series arguments are hashed by value, so a new process (or
+    gunicorn worker) calling with the same data loads the pickled result instead of
+    recomputing it. Results are written atomically, and the cache is bounded to
+    `max_bytes` by evicting the least recently used files. Calls with arguments that
+    cannot be hashed, and all calls when BODYFAT_MEMO=0, run uncached. The
+    undecorated function is available as `func.__wrapped__`.
+
+    Parameters:
+    ----------
+    func : callable
+        Function to memoize (the decorator can also be used with keyword arguments only).
+    ignore : tuple of str
+        Parameters that do not change the result (e.g. 'n_jobs') and are left out of the key.
+    memo_dir : str, optional
+        Cache directory (default: MEMO_DIR).
+    max_bytes : int, optional
+        Size bound of the cache directory (default: MEMO_MAX_BYTES).
+
+    Returns:
+    -------
+    wrapper : callable
+    """
+
+    if func is None:
+        return functools.partial(disk_memoize, ignore=ignore, memo_dir=memo_dir, max_bytes=max_bytes)
+
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not memo_enabled():
+            return func(*args, **kwargs)
+
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = {name: value for name, value in bound.arguments.items() if name not in ignore}
+
+        try:
+            key = call_key(func, arguments)
+        except TypeError:
+            return func(*args, **kwargs)
+
+        path = os.path.join(memo_dir or MEMO_DIR, f'{func.__name__}-{key[:32]}.pkl')
+        found, value = _load(path)
+        if found:
+            return value
+
+        value = func(*args, **kwargs)
+        _store(path, value, max_bytes or MEMO_MAX_BYTES)
+        return value
+
+    return wrapper
+
+
+def clear_memo(memo_dir=None):
+    """Delete every cached result."""
+    for path in glob.glob(os.path.join(memo_dir or MEMO_DIR, '*.pkl')):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -4,6 +4,7 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 import itertools
+from functools import partial
 import numpy as np
 import pandas as pd
 import statsmodels.api as sm
@@ -12,13 +13,180 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import scipy.stats as stats
 from scipy.interpolate import UnivariateSpline
-from statsmodels.nonparametric.smoothers_lowess import lowess
-from statsmodels.stats.outliers_influence import variance_inflation_factor
+from model.best_subset import gram_all_combinations, gray_code_all_combinations, cross_validate_combinations
+from model.vif import vif_correlation_matrix, subset_mean_vif
+from model.parallel import parallel_map, resolve_n_jobs, split_into_chunks
+from model.smoothing import smooth_many
+from model.influence import influence_statistics
+from model.memoize import disk_memoize
 
 
+class _lazy:
+    """
+    Memoized property for classes with __slots__: the value is computed on first
+    access and stored in the slot named '_<name>'.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.slot = '_' + func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        try:
+            return getattr(obj, self.slot)
+        except AttributeError:
+            value = self.func(obj)
+            setattr(obj, self.slot, value)
+            return value
+
+
+class RegressionResults:
+    """
+    Results of `run_regression_and_summary`.
+
+    Statistics are computed only when accessed and then memoized, and the influence
+    diagnostics (leverage, standardized residuals, Cook's distance) come from a single
+    thin QR of the design matrix (see model/influence.py). Item access with the keys of the former results dict
+    (e.g. results['RMSE (Test set)'], results['Coefficient (AGE)']) is supported, so
+    the object can be used wherever that dict was.
+    """
+
+    __slots__ = ('model', 'X_test', 'y_test',
+                 '_influence', '_y_pred_test', '_rmse_test',
+                 '_leverage', '_standardized_residuals', '_cooks_distance')
+
+    # Former dict keys -> attribute names
+    _KEYS = {
+        'Intercept': 'intercept',
+        'p-value (Intercept)': 'p_value_intercept',
+        'R-squared (Test set)': 'r_squared',
+        'Adjusted R-squared (Test set)': 'adj_r_squared',
+        'RMSE (Test set)': 'rmse_test',
+        'F-statistic': 'f_statistic',
+        'p-value (F-statistic)': 'p_value_f_statistic',
+        'AIC': 'aic',
+        'BIC': 'bic',
+        'Residuals': 'residuals',
+        'Fitted Values': 'fitted_values',
+        'Leverage': 'leverage',
+        'Standardized Residuals': 'standardized_residuals',
+        'Cook\'s Distance': 'cooks_distance'
+    }
+
+    def __init__(self, model, X_test, y_test):
+        self.model = model
+        self.X_test = X_test
+        self.y_test = y_test
+
+    # Cheap statistics (statsmodels caches these on the model itself)
+    @property
+    def intercept(self):
+        return self.model.params['const']
+
+    @property
+    def p_value_intercept(self):
+        return self.model.pvalues['const']
+
+    @property
+    def coefficients(self):
+        return self.model.params
+
+    @property
+    def p_values(self):
+        return self.model.pvalues
+
+    @property
+    def r_squared(self):
+        return self.model.rsquared
+
+    @property
+    def adj_r_squared(self):
+        return self.model.rsquared_adj
+
+    @property
+    def f_statistic(self):
+        return self.model.fvalue
+
+    @property
+    def p_value_f_statistic(self):
+        return self.model.f_pvalue
+
+    @property
+    def aic(self):
+        return self.model.aic
+
+    @property
+    def bic(self):
+        return self.model.bic
+
+    @property
+    def residuals(self):
+        return self.model.resid
+
+    @property
+    def fitted_values(self):
+        return self.model.fittedvalues
+
+    # Test-set predictions and diagnostics, computed on first access
+    @_lazy
+    def y_pred_test(self):
+        """Predictions on the test set."""
+        return self.model.predict(sm.add_constant(self.X_test))
+
+    @_lazy
+    def rmse_test(self):
+        """RMSE on the test set."""
+        return root_mean_squared_error(self.y_test, self.y_pred_test)
+
+    @_lazy
+    def influence(self):
+        """Leverage, standardized residuals and Cook's distance from one thin QR."""
+        return influence_statistics(self.model.model.exog, self.model.resid)
+
+    @_lazy
+    def leverage(self):
+        """Diagonal of the hat matrix."""
+        return self.influence['Leverage']
+
+    @_lazy
+    def standardized_residuals(self):
+        """Internally studentized residuals."""
+        return self.influence['Standardized Residuals']
+
+    @_lazy
+    def cooks_distance(self):
+        """Cook's distance of every training observation."""
+        return self.influence['Cook\'s Distance']
+
+    def __getitem__(self, key):
+        if key in self._KEYS:
+            return getattr(self, self._KEYS[key])
+        # 'Coefficient (<feature>)' and 'p-value (<feature>)', None if not in the model
+        for prefix, values in (('Coefficient (', self.model.params), ('p-value (', self.model.pvalues)):
+            if key.startswith(prefix) and key.endswith(')'):
+                return values.get(key[len(prefix):-1], None)
+        raise KeyError(key)
+
+    def keys(self):
+        features = [name for name in self.model.params.index if name != 'const']
+        per_feature = [key for name in features
+                       for key in (f'Coefficient ({name})', f'p-value ({name})')]
+        return ['Intercept', 'p-value (Intercept)'] + per_feature + list(self._KEYS)[2:]
+
+    def to_dict(self):
+        """Evaluate every statistic and return them as the former results dict."""
+        return {key: self[key] for key in self.keys()}
+
+
+@disk_memoize
 def run_regression_and_summary(X_train, y_train, X_test, y_test):
     """
     Perform linear regression using statsmodels and return relevant statistics on the test set.
+
+    Returns a RegressionResults object whose statistics are computed lazily on access.
     """
     # Add a constant (intercept) to X_train
     X_train_with_const = sm.add_constant(X_train)
@@ -26,84 +194,30 @@ def run_regression_and_summary(X_train, y_train, X_test, y_test):
     # Fit the model using statsmodels
     model = sm.OLS(y_train, X_train_with_const).fit()
 
-    # Add a constant (intercept) to X_test
-    X_test_with_const = sm.add_constant(X_test)
-
-    # Make predictions on the test set
-    y_pred_test = model.predict(X_test_with_const)
-
-    # Calculate residuals and fitted values for diagnostics
-    residuals = model.resid  # Use the model's residuals attribute
-    fitted_values = model.fittedvalues
-
-    # Use in-built statsmodels metrics
-    rmse_test = root_mean_squared_error(y_test, y_pred_test)
-    r_squared_test = model.rsquared  # R-squared
-    adj_r_squared_test = model.rsquared_adj  # Adjusted R-squared
-    f_statistic = model.fvalue  # F-statistic
-    p_value_f_statistic = model.f_pvalue  # P-value for F-statistic
-    aic = model.aic  # AIC
-    bic = model.bic  # BIC
-
-    # Extract the necessary statistics from the model
-    intercept = model.params['const']
-    p_value_intercept = model.pvalues['const']
-    
-    coef_age = model.params.get('AGE', None)
-    p_value_age = model.pvalues.get('AGE', None)
-    
-    coef_adiposity = model.params.get('ABDOMEN', None)
-    p_value_adiposity = model.pvalues.get('ABDOMEN', None)
-
-    # Create a dictionary with the required outputs
-    results = {
-        'Intercept': intercept,
-        'p-value (Intercept)': p_value_intercept,
-        'Coefficient (AGE)': coef_age,
-        'p-value (AGE)': p_value_age,
-        'Coefficient (ABDOMEN)': coef_adiposity,
-        'p-value (ABDOMEN)': p_value_adiposity,
-        'R-squared (Test set)': r_squared_test,
-        'Adjusted R-squared (Test set)': adj_r_squared_test,
-        'RMSE (Test set)': rmse_test,
-        'F-statistic': f_statistic,
-        'p-value (F-statistic)': p_value_f_statistic,
-        'AIC': aic,
-        'BIC': bic,
-        'Residuals': residuals,
-        'Fitted Values': fitted_values,
-        'Leverage': model.get_influence().hat_matrix_diag,  # Leverage values
-        'Standardized Residuals': model.get_influence().resid_studentized_internal,  # Standardized residuals
-        'Cook\'s Distance': model.get_influence().cooks_distance[0]  # Cook's distance
-    }
-    
-    return results
+    return RegressionResults(model, X_test, y_test)
 
 # Function to calculate VIF for a subset of features
-def calculate_vif(X_subset):
+def calculate_vif(X_subset, vif_corr=None):
+    """
+    Mean VIF of the columns of X_subset. Pass `vif_corr` (see model/vif.py) computed
+    on a superset of the columns to reuse it instead of recomputing the cross-products.
+    """
     if X_subset.shape[1] == 1:
         # If there's only one feature, VIF can't be calculated, so return np.nan
         return np.nan
-    else:
-        vif_data = pd.DataFrame()
-        vif_data['Feature'] = X_subset.columns
-        vif_data['VIF'] = [variance_inflation_factor(X_subset.values, i) for i in range(X_subset.shape[1])]
-        return vif_data['VIF'].mean()
-    
-# Function to fit all combinations of features
-def fit_all_combinations(X_train, X_test, y_train, y_test):
-    feature_names = X_train.columns
-    all_combinations = []
-    
-    # Generate all non-empty subsets of features
-    for r in range(1, len(feature_names) + 1):
-        subsets = itertools.combinations(feature_names, r)
-        all_combinations.extend(subsets)
+    idx = None if vif_corr is None else vif_corr.columns.get_indexer(X_subset.columns)
+    if idx is None or (idx < 0).any():
+        # A column missing from the precomputed matrix (-1) would silently index its last row
+        vif_corr = vif_correlation_matrix(X_subset)
+        idx = vif_corr.columns.get_indexer(X_subset.columns)
+    return subset_mean_vif(vif_corr, idx)
     
+# Function to fit the statsmodels model for a chunk of feature combinations
+def _fit_combinations(X_train, X_test, y_train, y_test, vif_corr, loocv, combinations):
     # List to store results
     results = []
     
-    for combo in all_combinations:
+    for combo in combinations:
         # Select the subset of features
         X_train_subset = X_train[list(combo)]
         X_test_subset = X_test[list(combo)]
@@ -121,15 +235,79 @@ def fit_all_combinations(X_train, X_test, y_train, y_test):
         # Calculate R-squared, RMSE, and VIF
         r_squared = model.rsquared
         rmse = root_mean_squared_error(y_test, y_pred)
-        mean_vif = calculate_vif(X_train_subset.drop(columns='const'))  # Drop intercept for VIF calculation
+        mean_vif = calculate_vif(X_train_subset.drop(columns='const'), vif_corr)  # Drop intercept for VIF calculation
         
         # Store the results
-        results.append({
+        row = {
             'Features': ', '.join(combo),
             'R-squared': r_squared,
             'RMSE': rmse,
             'Mean VIF': mean_vif
-        })
+        }
+
+        if loocv:
+            # Leave-one-out RMSE from the PRESS residuals e / (1 - h), no refitting
+            X_design = X_train_subset.values
+            leverage = np.einsum('ij,jk,ik->i', X_design, model.normalized_cov_params.values, X_design)
+            row['LOOCV RMSE'] = np.sqrt(np.mean((model.resid.values / (1 - leverage)) ** 2))
+
+        results.append(row)
+
+    return results
+
+# Function to fit all combinations of features
+@disk_memoize(ignore=('n_jobs',))
+def fit_all_combinations(X_train, X_test, y_train, y_test, method='statsmodels', n_jobs=1, loocv=False,
+                         cv_folds=None, cv_repeats=10, random_state=123):
+    """
+    Fit a regression model for every non-empty subset of features and report
+    R-squared, test RMSE and mean VIF, sorted by RMSE.
+
+    method : 'statsmodels' fits one sm.OLS model per subset; 'gram' scores every
+             subset from a single X'X / X'y computation; 'gray' walks the subsets in
+             Gray-code order with one sweep per step (see model/best_subset.py).
+    n_jobs : number of worker processes the combinations are split across
+             (default 1, serial; -1 uses every core). The merged table is identical
+             to the serial one.
+    loocv  : add a 'LOOCV RMSE' column, the leave-one-out RMSE on the training set
+             computed in closed form from the PRESS residuals e / (1 - h).
+    cv_folds : if set, add 'CV RMSE' and 'CV RMSE (std)' columns from repeated
+               K-fold cross-validation on the training set (cv_folds folds,
+               reshuffled cv_repeats times) and sort by 'CV RMSE' instead, which
+               does not hinge on a single train/test split.
+    """
+    if cv_folds is not None:
+        results_df = fit_all_combinations(X_train, X_test, y_train, y_test, method=method,
+                                          n_jobs=n_jobs, loocv=loocv)
+        cv_df = cross_validate_combinations(X_train, y_train, n_splits=cv_folds, n_repeats=cv_repeats,
+                                            random_state=random_state, n_jobs=n_jobs)
+        results_df = results_df.merge(cv_df, on='Features', how='left')
+        return results_df.sort_values(by='CV RMSE', ascending=True, kind='stable').reset_index(drop=True)
+
+    if method == 'gram':
+        return gram_all_combinations(X_train, X_test, y_train, y_test, n_jobs=n_jobs, loocv=loocv)
+    elif method == 'gray':
+        return gray_code_all_combinations(X_train, X_test, y_train, y_test, n_jobs=n_jobs, loocv=loocv)
+    elif method != 'statsmodels':
+        raise ValueError(f"Unknown method '{method}', expected 'statsmodels', 'gram' or 'gray'")
+
+    feature_names = X_train.columns
+    all_combinations = []
+    
+    # Generate all non-empty subsets of features
+    for r in range(1, len(feature_names) + 1):
+        subsets = itertools.combinations(feature_names, r)
+        all_combinations.extend(subsets)
+    
+    # VIFs of every subset come from one correlation matrix of the training features
+    vif_corr = vif_correlation_matrix(X_train)
+
+    # Split the combinations into chunks (a few per worker) and fit them in parallel;
+    # chunks come back in order, so the merged list matches the serial loop
+    n_jobs = resolve_n_jobs(n_jobs)
+    chunks = split_into_chunks(all_combinations, 4 * n_jobs)
+    fit_chunk = partial(_fit_combinations, X_train, X_test, y_train, y_test, vif_corr, loocv)
+    results = [row for chunk in parallel_map(fit_chunk, chunks, n_jobs) for row in chunk]
     
     # Create a DataFrame from the results
     results_df = pd.DataFrame(results)
@@ -232,11 +410,21 @@ def loess_smoothing(x, y, smoothing_factor=1.5):  # Increased smoothing factor
         # Return unsmoothed line as fallback if spline fails
         return x, y
 
-def generate_diagnostic_plots(results, df):
+def generate_diagnostic_plots(results, df, smoother='auto'):
+    # smoother: 'lowess' (statsmodels, exact), 'binned' (grid approximation for large n)
+    # or 'auto' (exact up to model.smoothing.BINNED_LOWESS_MIN_N points)
     residuals = results['Residuals']
     fitted_values = results['Fitted Values']
     leverage = results['Leverage']
     standardized_residuals = results['Standardized Residuals']
+    sqrt_standardized_residuals = np.sqrt(np.abs(standardized_residuals))
+
+    # LOESS smoothing lines of the three residual panels
+    lowess_fitted, lowess_scale, lowess_leverage = smooth_many([
+        (residuals, fitted_values),
+        (sqrt_standardized_residuals, fitted_values),
+        (standardized_residuals, leverage)
+    ], smoother=smoother)
 
     # Subplot layout
     fig = make_subplots(rows=2, cols=2, subplot_titles=(
@@ -258,10 +446,9 @@ def generate_diagnostic_plots(results, df):
     ), row=1, col=1)
 
     # Add LOESS smoothing line for Residuals vs Fitted
-    lowess_result = lowess(residuals, fitted_values, frac=2/3, it=5)
     fig.add_trace(go.Scatter(
-        x=lowess_result[:, 0], 
-        y=lowess_result[:, 1], 
+        x=lowess_fitted[:, 0], 
+        y=lowess_fitted[:, 1], 
         mode='lines',
         line=dict(color='red', width=2),
         name='loess smoothing curve',
@@ -289,7 +476,6 @@ def generate_diagnostic_plots(results, df):
     ), row=1, col=2)
 
     # 3. Scale-Location plot (Square root of standardized residuals vs fitted values)
-    sqrt_standardized_residuals = np.sqrt(np.abs(standardized_residuals))
     fig.add_trace(go.Scatter(
         x=fitted_values, 
         y=sqrt_standardized_residuals, 
@@ -301,10 +487,9 @@ def generate_diagnostic_plots(results, df):
     ), row=2, col=1)
 
     # Add LOESS smoothing line for Scale-Location plot
-    lowess_result = lowess(sqrt_standardized_residuals, fitted_values, frac=2/3, it=5)
     fig.add_trace(go.Scatter(
-        x=lowess_result[:, 0], 
-        y=lowess_result[:, 1], 
+        x=lowess_scale[:, 0], 
+        y=lowess_scale[:, 1], 
         mode='lines',
         line=dict(color='red', width=2),
         name='loess smoothing curve',
@@ -322,7 +507,6 @@ def generate_diagnostic_plots(results, df):
     ), row=2, col=2)
 
     # Add LOESS smoothing line for Residuals vs Leverage plot
-    lowess_leverage = lowess(standardized_residuals, leverage, frac=2/3, it=5)
     fig.add_trace(go.Scatter(
         x=lowess_leverage[:, 0], 
         y=lowess_leverage[:, 1], 
@@ -0,0 +1,245 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import glob
+import hashlib
+import importlib
+import json
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+import plotly
+from model import datasets
+from model.parallel import parallel_map
+
+# Version of the on-disk layout; bump when the manifest or the files change meaning
+PAGE_ARTIFACT_VERSION = 1
+
+MANIFEST = 'manifest.json'
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Output of `python model/page_artifacts.py` (git-ignored, rebuilt on deploy)
+DEFAULT_PAGE_ARTIFACT_DIR = os.environ.get('BODYFAT_PAGE_ARTIFACT_DIR',
+                                           os.path.join(APP_DIR, 'artifacts', 'pages'))
+
+# Code the artifacts are computed by; a change to any of it invalidates them
+SOURCE_DIRS = ('model', 'second_page', 'fourth_page', 'fifth_page')
+
+# Artifact name -> (module, function computing it). Every function returns a Plotly
+# figure, or a dict of figures, that the page would otherwise compute on first request.
+BUILD_TASKS = {
+    'combination_table': ('fourth_page.feature_combination_table', 'combination_table_figure'),
+    'f_test_table': ('fourth_page.f_statistic_graph', 'f_test_figure'),
+    'best_predictors_table': ('fourth_page.most_significant_features', 'best_predictors_figure'),
+    'mlr_regression': ('fifth_page.mlr_visualization', 'regression_figures'),
+    'mlr_bootstrap': ('fifth_page.mlr_visualization', 'bootstrap_figure'),
+    'mlr_diagnostics': ('fifth_page.mlr_visualization', 'diagnostic_figure'),
+    'summary_statistics': ('second_page.summary_statistics', 'summary_statistics_figures')
+}
+
+_fingerprint = None
+_manifests = {}
+_loaded = {}
+_lock = threading.Lock()
+
+
+def _artifacts_enabled():
+    return os.environ.get('BODYFAT_PAGE_ARTIFACTS', '1') != '0'
+
+
+def source_fingerprint():
+    """
+    SHA-256 of the datasets and of the code in SOURCE_DIRS. Stored in the manifest
+    at build time and compared at load time, so stale artifacts are never served.
+    """
+
+    global _fingerprint
+    if _fingerprint is None:
+        digest = hashlib.sha256()
+        for directory in SOURCE_DIRS:
+            for path in sorted(glob.glob(os.path.join(APP_DIR, directory, '*.py'))):
+                digest.update(os.path.relpath(path, APP_DIR).encode())
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+
+        _fingerprint = {
+            'datasets': {name: datasets.dataset_sha256(name) for name in datasets.DATASETS},
+            'code_sha256': digest.hexdigest()
+        }
+    return _fingerprint
+
+
+def _valid_manifest(path):
+    # Manifest of an artifact directory if it was built from the current datasets
+    # and code, else None; checked once per directory
+    if path not in _manifests:
+        try:
+            with open(os.path.join(path, MANIFEST)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = None
+
+        if manifest is not None and (manifest.get('page_artifact_version') != PAGE_ARTIFACT_VERSION
+                                     or manifest.get('fingerprint') != source_fingerprint()):
+            manifest = None
+        _manifests[path] = manifest
+    return _manifests[path]
+
+
+def load_page_artifact(name, path=None):
+    """
+    Load one artifact written by `build_page_artifacts`.
+
+    Parameters:
+    ----------
+    name : str
+        Artifact name (a key of BUILD_TASKS).
+    path : str, optional
+        Artifact directory (default: DEFAULT_PAGE_ARTIFACT_DIR).
+
+    Returns:
+    -------
+    value : dict or None
+        The parsed figure JSON, or None when the artifacts are disabled
+        (BODYFAT_PAGE_ARTIFACTS=0), missing, or built from other data or code.
+    """
+
+    if not _artifacts_enabled():
+        return None
+
+    path = path or DEFAULT_PAGE_ARTIFACT_DIR
+    with _lock:
+        if (path, name) not in _loaded:
+            manifest = _valid_manifest(path)
+            value = None
+            if manifest is not None and name in manifest['artifacts']:
+                try:
+                    with open(os.path.join(path, manifest['artifacts'][name]['file'])) as f:
+                        value = json.load(f)
+                except (OSError, ValueError):
+                    value = None
+            _loaded[(path, name)] = value
+        return _loaded[(path, name)]
+
+
+def page_artifact(name, compute, path=None):
+    """Stored artifact `name` if available, otherwise `compute()`."""
+    value = load_page_artifact(name, path)
+    return compute() if value is None else value
+
+
+def _compute_artifact(name):
+    # Run in a worker process: import the page module, compute the artifact and
+    # return its JSON, so that only text crosses the process boundary
+    module, function = BUILD_TASKS[name]
+    start = time.perf_counter()
+    value = getattr(importlib.import_module(module), function)()
+    return json.dumps(value, cls=plotly.utils.PlotlyJSONEncoder), time.perf_counter() - start
+
+
+def _write_text(path, text):
+    # Write to a temporary file and rename it, so that readers never see a partial file
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    with os.fdopen(fd, 'w') as f:
+        f.write(text)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+def build_page_artifacts(path=None, names=None, n_jobs=-1):
+    """
+    Compute the page artifacts in parallel and write them as JSON files.
+
+    Parameters:
+    ----------
+    path : str, optional
+        Artifact directory (default: DEFAULT_PAGE_ARTIFACT_DIR).
+    names : list of str, optional
+        Artifacts to build (default: all of BUILD_TASKS). Other artifacts of a
+        build from the current datasets and code stay in the manifest.
+    n_jobs : int
+        Worker processes (see model/parallel.py; -1 uses every core).
+
+    Returns:
+    -------
+    manifest : dict
+    """
+
+    path = path or DEFAULT_PAGE_ARTIFACT_DIR
+    names = list(names or BUILD_TASKS)
+    os.makedirs(path, exist_ok=True)
+
+    # Keep the entries of a current build that are not rebuilt (e.g. with --names)
+    with _lock:
+        _manifests.pop(path, None)
+        previous = _valid_manifest(path)
+    artifacts = {}
+    if previous is not None:
+        artifacts = {name: artifact for name, artifact in previous['artifacts'].items()
+                     if name not in names and os.path.exists(os.path.join(path, artifact['file']))}
+
+    # Invalidate the current build first, so an interrupted build is never served
+    if os.path.exists(os.path.join(path, MANIFEST)):
+        os.remove(os.path.join(path, MANIFEST))
+
+    results = parallel_map(_compute_artifact, names, n_jobs=n_jobs)
+
+    for name, (text, seconds) in zip(names, results):
+        file = f'{name}.json'
+        _write_text(os.path.join(path, file), text)
+        artifacts[name] = {
+            'file': file,
+            'sha256': hashlib.sha256(text.encode()).hexdigest(),
+            'bytes': len(text.encode()),
+            'seconds': round(seconds, 3)
+        }
+
+    manifest = {
+        'page_artifact_version': PAGE_ARTIFACT_VERSION,
+        'fingerprint': source_fingerprint(),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'artifacts': artifacts
+    }
+    _write_text(os.path.join(path, MANIFEST), json.dumps(manifest, indent=2))
+
+    # Drop anything this process already loaded from the previous build
+    with _lock:
+        _manifests.pop(path, None)
+        for key in [key for key in _loaded if key[0] == path]:
+            del _loaded[key]
+
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute the tables and figures of the app pages.')
+    parser.add_argument('--dataset-dir', default=datasets.DATASET_DIR, help='Directory of the dataset CSVs.')
+    parser.add_argument('--output', default=DEFAULT_PAGE_ARTIFACT_DIR, help='Artifact directory.')
+    parser.add_argument('--names', nargs='+', default=None, choices=list(BUILD_TASKS),
+                        help='Artifacts to build (default: all).')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='Worker processes (-1 for every core).')
+    args = parser.parse_args()
+
+    # Workers read the datasets from the same directory
+    os.environ['BODYFAT_DATASET_DIR'] = args.dataset_dir
+    datasets.DATASET_DIR = args.dataset_dir
+
+    start = time.perf_counter()
+    manifest = build_page_artifacts(args.output, args.names, args.n_jobs)
+    elapsed = time.perf_counter() - start
+
+    names = args.names or list(BUILD_TASKS)
+    for name in names:
+        artifact = manifest['artifacts'][name]
+        print(f"{name:>22} {artifact['bytes'] / 1024:8.0f} KiB {artifact['seconds']:7.2f}s")
+    print(f"Wrote {len(names)} artifacts to {args.output} in {elapsed:.2f}s "
+          f"({len(manifest['artifacts'])} in the manifest)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from concurrent.futures import ProcessPoolExecutor
+
+
+def resolve_n_jobs(n_jobs):
+    """
+    Turn an `n_jobs` argument into a worker count: None or 1 runs serially, and
+    negative values count back from the number of cores (-1 uses all of them).
+    """
+
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max((os.cpu_count() or 1) + 1 + n_jobs, 1)
+    return max(n_jobs, 1)
+
+
+def split_into_chunks(items, n_chunks):
+    """
+    Split a list into at most `n_chunks` contiguous chunks of (almost) equal length,
+    preserving order.
+    """
+
+    items = list(items)
+    n_chunks = max(min(n_chunks, len(items)), 1)
+    size, extra = divmod(len(items), n_chunks)
+
+    chunks = []
+    start = 0
+    for i in range(n_chunks):
+        stop = start + size + (1 if i < extra else 0)
+        chunks.append(items[start:stop])
+        start = stop
+
+    return chunks
+
+
+def parallel_map(func, tasks, n_jobs=1):
+    """
+    Apply `func` to every task on a process pool and return the results in task order.
+
+    Parameters:
+    ----------
+    func : callable
+        Picklable (module-level) function, e.g. a functools.partial of one.
+    tasks : list
+        Arguments, one per call.
+    n_jobs : int or None
+        Number of worker processes (see `resolve_n_jobs`). With one worker, or a
+        single task, everything runs in the calling process.
+
+    Returns:
+    -------
+    results : list
+        func(task) for every task, in the same order as `tasks`.
+    """
+
+    tasks = list(tasks)
+    n_jobs = min(resolve_n_jobs(n_jobs), len(tasks))
+
+    if n_jobs <= 1:
+        return [func(task) for task in tasks]
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        return list(executor.map(func, tasks))
@@ -3,6 +3,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+import numpy as np
 import pandas as pd
 
 # Define the prior body fat model
@@ -22,6 +23,27 @@ def prior_bmi_model(adiposity, age):
     # Body fat percentage estimation based on BMI and age
     return 48.1 - (848 * (1 / adiposity)) + (0.079 * age) + (0.05 * age) + (39.0 * (1 / adiposity))
 
+# Columns the anomaly detection needs
+required_columns = ['IDNO', 'BODYFAT', 'ADIPOSITY', 'AGE']
+
+def _check_columns(df):
+    # Check if required columns are present
+    if not all(col in df.columns for col in required_columns):
+        raise ValueError(f"Dataset must contain the following columns: {required_columns}")
+
+def _anomalies_frame(idno, bodyfat_actual, bodyfat_predicted, deviation):
+    # Same output as the former row-by-row loop, including an empty DataFrame
+    # (without columns) when nothing is flagged
+    if len(idno) == 0:
+        return pd.DataFrame()
+
+    return pd.DataFrame({
+        'IDNO': idno.astype(int),
+        'BODYFAT_ACTUAL': bodyfat_actual,
+        'BODYFAT_PREDICTED': bodyfat_predicted,
+        'DEVIATION': deviation
+    })
+
 # Function to find anomalies based on the prior model
 def find_anomalies(df, threshold):
     """
@@ -36,40 +58,59 @@ def find_anomalies(df, threshold):
     anomalies (pd.DataFrame): DataFrame containing rows where BODYFAT values 
                               significantly deviate from predicted body fat.
     """
-    required_columns = ['IDNO', 'BODYFAT', 'ADIPOSITY', 'AGE']
-    
-    # Check if required columns are present
-    if not all(col in df.columns for col in required_columns):
-        raise ValueError(f"Dataset must contain the following columns: {required_columns}")
-    
-    anomalies = []
-
-    # Iterate over each row in the DataFrame
-    for i, row in df.iterrows():
-        idno = row['IDNO']
-        bodyfat_actual = row['BODYFAT']
-        adiposity = row['ADIPOSITY']
-        age = row['AGE']
-
-        bodyfat_predicted = prior_bmi_model(adiposity, age)
-
-        # Skip rows with invalid predictions
-        if bodyfat_predicted is None:
-            continue
-
-        deviation = abs(bodyfat_actual - bodyfat_predicted)
-        
-        # If the actual body fat deviates significantly from the predicted, flag it as an anomaly
-        if deviation > threshold:
-            anomalies.append({
-                'IDNO': int(idno),
-                'BODYFAT_ACTUAL': bodyfat_actual,
-                'BODYFAT_PREDICTED': bodyfat_predicted,
-                'DEVIATION': deviation
-            })
-    
-    # Return the anomalies as a DataFrame
-    return pd.DataFrame(anomalies)
+    _check_columns(df)
+
+    # Evaluate the prior model on every row at once
+    bodyfat_actual = df['BODYFAT'].to_numpy(dtype=float)
+    bodyfat_predicted = prior_bmi_model(df['ADIPOSITY'].to_numpy(dtype=float), df['AGE'].to_numpy(dtype=float))
+    deviation = np.abs(bodyfat_actual - bodyfat_predicted)
+
+    # If the actual body fat deviates significantly from the predicted, flag it as an anomaly
+    flagged = deviation > threshold
+
+    return _anomalies_frame(df['IDNO'].to_numpy()[flagged], bodyfat_actual[flagged],
+                            bodyfat_predicted[flagged], deviation[flagged])
+
+class AnomalyIndex:
+    """
+    Deviation index of a dataset for repeated anomaly threshold queries.
+
+    The prior model is evaluated once and the deviations are sorted in descending
+    order. The rows flagged at any threshold are then a prefix of that order, found
+    with one `np.searchsorted`, so `query` costs O(log n) plus the size of its
+    output. `query(threshold)` returns exactly what `find_anomalies(df, threshold)` does.
+
+    --- inputs ---
+    df (pd.DataFrame): Input dataframe with columns IDNO, BODYFAT, ADIPOSITY, AGE.
+    """
+
+    def __init__(self, df):
+        _check_columns(df)
+
+        bodyfat_actual = df['BODYFAT'].to_numpy(dtype=float)
+        bodyfat_predicted = prior_bmi_model(df['ADIPOSITY'].to_numpy(dtype=float), df['AGE'].to_numpy(dtype=float))
+        deviation = np.abs(bodyfat_actual - bodyfat_predicted)
+
+        # Rows with a valid deviation, largest deviation first (NaN is never flagged)
+        valid = np.flatnonzero(~np.isnan(deviation))
+        self.order = valid[np.argsort(-deviation[valid], kind='stable')]
+        self.negated_deviation = -deviation[self.order]
+
+        self.idno = df['IDNO'].to_numpy()
+        self.bodyfat_actual = bodyfat_actual
+        self.bodyfat_predicted = bodyfat_predicted
+        self.deviation = deviation
+
+    def count(self, threshold):
+        """Number of rows whose deviation exceeds the threshold."""
+        # deviation > threshold  <=>  -deviation < -threshold
+        return int(np.searchsorted(self.negated_deviation, -threshold, side='left'))
+
+    def query(self, threshold):
+        """Anomalies at the threshold, in the row order of the dataset."""
+        rows = np.sort(self.order[:self.count(threshold)])
+        return _anomalies_frame(self.idno[rows], self.bodyfat_actual[rows],
+                                self.bodyfat_predicted[rows], self.deviation[rows])
 
 # Function to clean anomalies and impute data for the model
 def clean_df(df, anomalies):
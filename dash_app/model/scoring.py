@@ -0,0 +1,210 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from model.artifact import DEFAULT_ARTIFACT_DIR, load_model_artifact
+
+# Body fat bands by age group (NIH/WHO guidelines, Gallagher et al. 2000): inclusive
+# age range and the thresholds between the bands
+AGE_GROUPS = [
+    (20, 39, [8, 20, 25]),
+    (40, 59, [11, 22, 28]),
+    (60, 79, [13, 25, 30])
+]
+BAND_LABELS = ["Very Thin", "Normal", "High", "Obese"]
+
+# Smallest inputs the estimator accepts (age in years, abdomen in cm)
+MIN_AGE = 21
+MIN_ABDOMEN = 38
+
+
+def age_group(age):
+    """
+    Index into AGE_GROUPS of every age (-1 outside all groups).
+    """
+
+    age = np.asarray(age, dtype=float)
+    group = np.full(age.shape, -1, dtype=np.int8)
+    for i, (low, high, _) in enumerate(AGE_GROUPS):
+        group[(low <= age) & (age <= high)] = i
+    return group
+
+
+def classify_bands(age, body_fat):
+    """
+    Body fat band of every (age, body fat) pair, vectorized.
+
+    Within each age group the band is found with one `np.searchsorted` over the
+    group's thresholds; a value equal to a threshold falls in the upper band.
+
+    Returns:
+    -------
+    bands : np.ndarray
+        int8 index into BAND_LABELS, -1 where the age is outside every group.
+    """
+
+    body_fat = np.asarray(body_fat, dtype=float)
+    group = age_group(age)
+
+    bands = np.full(body_fat.shape, -1, dtype=np.int8)
+    for i, (_, _, thresholds) in enumerate(AGE_GROUPS):
+        mask = group == i
+        bands[mask] = np.searchsorted(thresholds, body_fat[mask], side='right')
+    return bands
+
+
+def score_frame(df, artifact):
+    """
+    Predicted body fat and band of every row of a DataFrame holding the model's
+    feature columns (and AGE).
+
+    Returns:
+    -------
+    scores : pd.DataFrame
+        'BODYFAT_PREDICTED' and 'BAND' (categorical, missing outside the age groups).
+    """
+
+    predicted = artifact.predict(df)
+    bands = classify_bands(df['AGE'].to_numpy(), predicted)
+
+    return pd.DataFrame({
+        'BODYFAT_PREDICTED': predicted,
+        'BAND': pd.Categorical.from_codes(bands, categories=BAND_LABELS)
+    }, index=df.index)
+
+
+def _is_parquet(path):
+    return path.lower().endswith(('.parquet', '.pq'))
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Reading or writing Parquet files requires pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def _optional_pyarrow():
+    # pyarrow's CSV writer is an order of magnitude faster than DataFrame.to_csv
+    try:
+        import pyarrow
+        import pyarrow.csv
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def iter_chunks(path, columns=None, chunksize=1_000_000):
+    """
+    Stream a CSV or Parquet file as DataFrames of at most `chunksize` rows.
+    """
+
+    if _is_parquet(path):
+        pa = _require_pyarrow()
+        for batch in pa.parquet.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+
+class _ChunkWriter:
+    # Appends scored chunks to a CSV or Parquet file as they are produced
+    def __init__(self, path):
+        self.path = path
+        self.parquet = _is_parquet(path)
+        self.pa = _require_pyarrow() if self.parquet else _optional_pyarrow()
+        self.writer = None
+        self.first = True
+
+    def write(self, df):
+        if self.pa is None:
+            df.to_csv(self.path, mode='w' if self.first else 'a', header=self.first,
+                      index=False, float_format='%.4f')
+            self.first = False
+            return
+
+        if not self.parquet:
+            # The CSV writer has no float format, and stores categoricals as strings
+            df = df.assign(BODYFAT_PREDICTED=df['BODYFAT_PREDICTED'].round(4),
+                           BAND=df['BAND'].astype(object))
+        table = self.pa.Table.from_pandas(df, preserve_index=False)
+
+        if self.writer is None:
+            if self.parquet:
+                self.writer = self.pa.parquet.ParquetWriter(self.path, table.schema)
+            else:
+                self.writer = self.pa.csv.CSVWriter(self.path, table.schema)
+        self.writer.write_table(table)
+        self.first = False
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def score_file(input_path, output_path, artifact=None, columns=None, chunksize=1_000_000):
+    """
+    Score a population file chunk by chunk and write the results incrementally.
+
+    Parameters:
+    ----------
+    input_path, output_path : str
+        CSV or Parquet files (by extension); Parquet needs pyarrow.
+    artifact : ModelArtifact, optional
+        Model to score with (default: the published artifact).
+    columns : list of str, optional
+        Input columns copied to the output (default: all of them).
+    chunksize : int
+        Rows per chunk.
+
+    Returns:
+    -------
+    n_rows : int
+        Number of rows scored.
+    """
+
+    artifact = artifact or load_model_artifact()
+    needed = list(dict.fromkeys(artifact.features + ['AGE']))
+    read_columns = None if columns is None else list(dict.fromkeys(columns + needed))
+
+    writer = _ChunkWriter(output_path)
+    n_rows = 0
+    try:
+        for chunk in iter_chunks(input_path, read_columns, chunksize):
+            scores = score_frame(chunk, artifact)
+            passthrough = chunk if columns is None else chunk[columns]
+            writer.write(pd.concat([passthrough, scores], axis=1))
+            n_rows += len(chunk)
+    finally:
+        writer.close()
+
+    return n_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score a CSV/Parquet file of AGE/ABDOMEN measurements.')
+    parser.add_argument('input', help='Input CSV or Parquet file.')
+    parser.add_argument('output', help='Output CSV or Parquet file.')
+    parser.add_argument('--artifact', default=DEFAULT_ARTIFACT_DIR, help='Model artifact directory.')
+    parser.add_argument('--columns', nargs='+', default=None,
+                        help='Input columns to copy to the output (default: all).')
+    parser.add_argument('--chunksize', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    n_rows = score_file(args.input, args.output, load_model_artifact(args.artifact),
+                        columns=args.columns, chunksize=args.chunksize)
+    elapsed = time.perf_counter() - start
+
+    print(f"Scored {n_rows:,} rows in {elapsed:.2f}s ({n_rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
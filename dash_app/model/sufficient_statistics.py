@@ -0,0 +1,227 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scipy.stats import f, t
+import numpy as np
+import pandas as pd
+
+
+class OLSAccumulator:
+    """
+    Mergeable sufficient statistics for an OLS regression with an intercept.
+
+    Rows are ingested in chunks (e.g. from `pd.read_csv(..., chunksize=...)`), and
+    accumulators built on different chunks or workers can be merged. Only the row
+    count, the column means of [X, y] and their centered cross-product matrix are
+    kept (O(p^2) memory), which is enough to produce the coefficients, sums of
+    squares, F-test and standard errors without a second pass over the data.
+    Chunks are combined with the pairwise update of Chan, Golub and LeVeque, which
+    is far better conditioned than summing raw X'X.
+
+    Parameters:
+    ----------
+    features : list of str
+        Names of the predictor columns.
+    response : str
+        Name of the response column (used when updating from a DataFrame).
+    """
+
+    def __init__(self, features, response='BODYFAT'):
+        self.features = list(features)
+        self.response = response
+
+        k = len(self.features) + 1
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+
+    def update(self, X, y=None):
+        """
+        Add a chunk of rows. Rows with missing values are skipped.
+
+        Parameters:
+        ----------
+        X : pd.DataFrame or np.ndarray
+            Predictors for the chunk. A DataFrame holding the response column can be
+            passed on its own.
+        y : pd.Series or np.ndarray, optional
+            Response for the chunk.
+
+        Returns:
+        -------
+        self : OLSAccumulator
+        """
+
+        if y is None:
+            y = X[self.response]
+        if isinstance(X, pd.DataFrame):
+            X = X[self.features]
+
+        data = np.column_stack([np.asarray(X, dtype=float), np.asarray(y, dtype=float)])
+        data = data[~np.isnan(data).any(axis=1)]
+        if len(data) == 0:
+            return self
+
+        chunk = OLSAccumulator(self.features, self.response)
+        chunk.n = len(data)
+        chunk.mean = data.mean(axis=0)
+        centered = data - chunk.mean
+        chunk.comoment = centered.T @ centered
+
+        return self.merge(chunk)
+
+    def merge(self, other):
+        """
+        Fold another accumulator (over the same features) into this one, in place.
+        """
+
+        if other.features != self.features:
+            raise ValueError("Cannot merge accumulators over different features")
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.comoment = other.n, other.mean.copy(), other.comoment.copy()
+            return self
+
+        n = self.n + other.n
+        delta = other.mean - self.mean
+
+        self.comoment = self.comoment + other.comoment + np.outer(delta, delta) * (self.n * other.n / n)
+        self.mean = self.mean + delta * (other.n / n)
+        self.n = n
+
+        return self
+
+    def __add__(self, other):
+        merged = OLSAccumulator(self.features, self.response)
+        return merged.merge(self).merge(other)
+
+    @property
+    def column_sums(self):
+        """Sums of the predictor columns and the response."""
+        return self.n * self.mean
+
+    @property
+    def XtX(self):
+        """Raw X'X of the design matrix with a leading constant column."""
+        k = len(self.features)
+        sums = self.column_sums[:k]
+        raw = self.comoment[:k, :k] + self.n * np.outer(self.mean[:k], self.mean[:k])
+        return np.block([[np.array([[self.n]]), sums[None, :]],
+                         [sums[:, None], raw]])
+
+    @property
+    def Xty(self):
+        """Raw X'y of the design matrix with a leading constant column."""
+        k = len(self.features)
+        raw = self.comoment[:k, k] + self.n * self.mean[:k] * self.mean[k]
+        return np.concatenate([[self.column_sums[k]], raw])
+
+    def fit(self):
+        """
+        Solve the least squares problem from the accumulated statistics.
+
+        Returns:
+        -------
+        results : dict
+            'Coefficients', 'Standard Errors', 't-values' and 'p-values' (pd.Series
+            indexed by 'const' and the feature names), 'SST', 'SSE', 'SSR',
+            'R-squared', 'F-statistic', 'p-value (F-statistic)', 'df_model',
+            'df_resid' and 'n'.
+        """
+
+        k = len(self.features)
+        if self.n <= k + 1:
+            raise ValueError(f"Need more than {k + 1} rows to fit {k} features with an intercept")
+
+        Sxx = self.comoment[:k, :k]
+        Sxy = self.comoment[:k, k]
+        x_mean = self.mean[:k]
+        y_mean = self.mean[k]
+
+        # Slopes from the centered normal equations, intercept from the means
+        Sxx_inv = np.linalg.inv(Sxx)
+        slopes = Sxx_inv @ Sxy
+        intercept = y_mean - x_mean @ slopes
+
+        # Sums of squares
+        SST = self.comoment[k, k]
+        SSE = SST - slopes @ Sxy
+        SSR = SST - SSE
+
+        df_model = k
+        df_resid = self.n - k - 1
+        MSE = SSE / df_resid
+
+        # Covariance of (intercept, slopes) for a model with a constant
+        cov = np.empty((k + 1, k + 1))
+        cov[1:, 1:] = MSE * Sxx_inv
+        cov[0, 1:] = cov[1:, 0] = -MSE * (Sxx_inv @ x_mean)
+        cov[0, 0] = MSE * (1 / self.n + x_mean @ Sxx_inv @ x_mean)
+
+        index = ['const'] + self.features
+        params = pd.Series(np.concatenate([[intercept], slopes]), index=index)
+        bse = pd.Series(np.sqrt(np.diag(cov)), index=index)
+        tvalues = params / bse
+
+        F_stat = (SSR / df_model) / MSE
+
+        return {
+            'Coefficients': params,
+            'Standard Errors': bse,
+            't-values': tvalues,
+            'p-values': pd.Series(2 * t.sf(np.abs(tvalues), df_resid), index=index),
+            'SST': SST,
+            'SSE': SSE,
+            'SSR': SSR,
+            'R-squared': SSR / SST,
+            'F-statistic': F_stat,
+            'p-value (F-statistic)': f.sf(F_stat, df_model, df_resid),
+            'df_model': df_model,
+            'df_resid': df_resid,
+            'n': self.n
+        }
+
+    def goodness_of_fit(self, alpha=0.05):
+        """
+        Same summary DataFrame as `general_goodness_of_fit` (SST, SSE, SSR,
+        F-statistic, p-value, F-critical), computed from the accumulated statistics.
+        """
+
+        results = self.fit()
+
+        return pd.DataFrame({
+            'SST': [results['SST']],
+            'SSE': [results['SSE']],
+            'SSR': [results['SSR']],
+            'F-statistic': [results['F-statistic']],
+            'p-value': [1 - f.cdf(results['F-statistic'], results['df_model'], results['df_resid'])],
+            'F-critical': [f.ppf(1 - alpha, results['df_model'], results['df_resid'])]
+        })
+
+
+def accumulate_csv(path, features, response='BODYFAT', chunksize=100_000):
+    """
+    Stream a CSV file in chunks into an `OLSAccumulator`, reading only the needed columns.
+
+    Parameters:
+    ----------
+    path : str
+        Path or URL of the CSV file.
+    features : list of str
+        Predictor columns.
+    response : str
+        Response column (default: 'BODYFAT').
+    chunksize : int
+        Rows per chunk.
+
+    Returns:
+    -------
+    accumulator : OLSAccumulator
+    """
+
+    accumulator = OLSAccumulator(features, response)
+    for chunk in pd.read_csv(path, usecols=list(features) + [response], chunksize=chunksize):
+        accumulator.update(chunk)
+    return accumulator
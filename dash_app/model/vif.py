@@ -0,0 +1,92 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+
+def correlation_from_gram(gram):
+    """
+    Scale a cross-product matrix X'X to unit diagonal, R = D^-1/2 X'X D^-1/2.
+
+    Parameters:
+    ----------
+    gram : np.ndarray
+        Square cross-product matrix (centered or uncentered).
+
+    Returns:
+    -------
+    corr : np.ndarray
+        Scaled matrix with ones on the diagonal.
+    """
+
+    scale = np.sqrt(np.diag(gram))
+    return gram / np.outer(scale, scale)
+
+
+def vif_correlation_matrix(X, centered=False):
+    """
+    Compute the correlation matrix that all VIFs of the columns of X are derived from.
+
+    The VIF of feature j within a subset S is the j-th diagonal element of the inverse
+    of the S x S submatrix, so this matrix is computed once and shared by every subset.
+
+    Parameters:
+    ----------
+    X : pd.DataFrame
+        Features (without a constant column).
+    centered : bool
+        If False (default), use the uncentered cross-products. This reproduces
+        statsmodels' `variance_inflation_factor` when called, as in this app, on a
+        design matrix without a constant. If True, use the Pearson correlation matrix,
+        which gives the textbook VIF of a model with an intercept.
+
+    Returns:
+    -------
+    corr : pd.DataFrame
+        Correlation matrix labelled by the columns of X.
+    """
+
+    values = np.asarray(X, dtype=float)
+    if centered:
+        values = values - values.mean(axis=0)
+
+    corr = correlation_from_gram(values.T @ values)
+    return pd.DataFrame(corr, index=X.columns, columns=X.columns)
+
+
+def subset_vif(corr, idx):
+    """
+    Compute the VIF of every feature of a subset from the shared correlation matrix.
+
+    Parameters:
+    ----------
+    corr : np.ndarray or pd.DataFrame
+        Output of `vif_correlation_matrix` (or `correlation_from_gram`).
+    idx : sequence of int
+        Positions of the subset's features in `corr`.
+
+    Returns:
+    -------
+    vif : np.ndarray
+        VIF of each feature in `idx` (inf when the subset is perfectly collinear).
+    """
+
+    idx = list(idx)
+    sub = np.asarray(corr)[np.ix_(idx, idx)]
+    try:
+        return np.diag(np.linalg.inv(sub))
+    except np.linalg.LinAlgError:
+        return np.full(len(idx), np.inf)
+
+
+def subset_mean_vif(corr, idx):
+    """
+    Mean VIF of a subset of features (np.nan for a single feature, as in the
+    combination table).
+    """
+
+    if len(idx) == 1:
+        return np.nan
+    return np.mean(subset_vif(corr, idx))
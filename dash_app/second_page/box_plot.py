@@ -5,10 +5,10 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from dash import dcc, html, Input, Output, callback
 import plotly.graph_objects as go
-import pandas as pd
+from model.datasets import load_dataset
 
 # Load the data
-df = pd.read_csv('https://raw.githubusercontent.com/Stochastic1017/Body_Fat_Study/refs/heads/main/dataset/BodyFat.csv')
+df = load_dataset('BodyFat.csv')
 
 # Define the layout for the box plot with jittered data
 box_plot_layout = html.Div([
@@ -6,10 +6,11 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from dash import dcc, html, Input, Output, callback
 import plotly.graph_objects as go
 import pandas as pd
-from statsmodels.stats.outliers_influence import variance_inflation_factor
+from model.datasets import load_dataset
+from model.vif import vif_correlation_matrix, subset_vif
 
 # Load the data
-df = pd.read_csv('https://raw.githubusercontent.com/Stochastic1017/Body_Fat_Study/refs/heads/main/dataset/BodyFat.csv')
+df = load_dataset('BodyFat.csv')
 
 # Define the layout for the correlation heatmap and VIF table
 correlation_heatmap_layout = html.Div([
@@ -28,12 +29,20 @@ correlation_heatmap_layout = html.Div([
     dcc.Graph(id='vif-table', style={'height': '400px'}),
 ], style={'width': '100%', 'display': 'inline-block', 'padding-bottom': '30px'})
 
+# Correlation matrix shared by the VIF table for every dropdown selection
+vif_corr = vif_correlation_matrix(df)
+
 # Function to compute VIF
-def compute_vif(df):
-    """Compute Variance Inflation Factor (VIF)"""
+def compute_vif(df, vif_corr=None):
+    """Compute Variance Inflation Factor (VIF), reusing `vif_corr` when it covers df's columns"""
+    idx = None if vif_corr is None else vif_corr.columns.get_indexer(df.columns)
+    if idx is None or (idx < 0).any():
+        # A column missing from the precomputed matrix (-1) would silently index its last row
+        vif_corr = vif_correlation_matrix(df)
+        idx = vif_corr.columns.get_indexer(df.columns)
     vif_data = pd.DataFrame()
     vif_data['Feature'] = df.columns
-    vif_data['VIF'] = [variance_inflation_factor(df.values, i) for i in range(len(df.columns))]
+    vif_data['VIF'] = subset_vif(vif_corr, idx)
     return vif_data
 
 # Callback to update correlation heatmap and VIF table based on selected features
@@ -73,7 +82,7 @@ def update_heatmap_and_vif(selected_features):
     )
 
     # Compute VIF and create a table figure
-    vif_data = compute_vif(filtered_df)
+    vif_data = compute_vif(filtered_df, vif_corr)
 
     # Create a table for the VIF data
     vif_table_fig = go.Figure(
@@ -4,10 +4,10 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from dash import dash_table, html, dcc
-import pandas as pd
+from model.datasets import load_dataset
 
 # Load the data
-df = pd.read_csv('https://raw.githubusercontent.com/Stochastic1017/Body_Fat_Study/refs/heads/main/dataset/BodyFat.csv')
+df = load_dataset('BodyFat.csv')
 
 data_table_layout = html.Div([
     html.H3("Interactable Data Table:", 
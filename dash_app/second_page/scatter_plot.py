@@ -6,13 +6,13 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from dash import dcc, html, Input, Output, callback
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import pandas as pd
+from model.datasets import load_dataset
 import numpy as np
 from scipy import stats
 import statsmodels.api as sm
 
 # Load the data
-df = pd.read_csv('https://raw.githubusercontent.com/Stochastic1017/Body_Fat_Study/refs/heads/main/dataset/BodyFat.csv')
+df = load_dataset('BodyFat.csv')
 
 # Define the layout for the scatter plot with histograms
 # Define the layout for the scatter plot with histograms
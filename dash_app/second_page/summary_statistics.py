@@ -5,13 +5,14 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from dash import dcc, html, Input, Output, callback
 import plotly.graph_objects as go
-import pandas as pd
+from model.datasets import load_dataset
 import numpy as np
 from scipy import stats
 from plotly.subplots import make_subplots
+from model.page_artifacts import load_page_artifact
 
 # Load the data
-df = pd.read_csv('https://raw.githubusercontent.com/Stochastic1017/Body_Fat_Study/refs/heads/main/dataset/BodyFat.csv')
+df = load_dataset('BodyFat.csv')
 
 # Define layout for visualizations and summary statistics
 summary_statistics_layout = html.Div([
@@ -32,12 +33,8 @@ summary_statistics_layout = html.Div([
     dcc.Graph(id='visualization-subplots', style={'height': '900px', 'margin-top': '20px'})
 ])
 
-# Callback for updating the visualizations
-@callback(
-    Output('visualization-subplots', 'figure'),
-    Input('feature-column', 'value')
-)
-def update_analysis(feature_column):
+# Summary statistics, histogram, boxplot and QQ-plot of one feature
+def summary_statistics_figure(feature_column):
     column_data = df[feature_column].dropna()
     row_indices = df.index
 
@@ -175,3 +172,19 @@ def update_analysis(feature_column):
                       paper_bgcolor='white')
     
     return fig
+
+def summary_statistics_figures():
+    """Figures of every feature in the dropdown, for the page artifacts."""
+    return {feature_column: summary_statistics_figure(feature_column) for feature_column in df.columns[1:]}
+
+# Callback for updating the visualizations
+@callback(
+    Output('visualization-subplots', 'figure'),
+    Input('feature-column', 'value')
+)
+def update_analysis(feature_column):
+    # Precomputed figure when the page artifacts are built (see model/page_artifacts.py)
+    figures = load_page_artifact('summary_statistics')
+    if figures is not None and feature_column in figures:
+        return figures[feature_column]
+    return summary_statistics_figure(feature_column)
@@ -5,11 +5,14 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from dash import dash_table, dcc, html, callback
 from dash.dependencies import Input, Output
-from model.prior_bmi_model_based_anomaly_detection import find_anomalies
-import pandas as pd
+from model.prior_bmi_model_based_anomaly_detection import AnomalyIndex
+from model.datasets import load_dataset
 
 # Load the dataset
-df = pd.read_csv('https://raw.githubusercontent.com/Stochastic1017/Body_Fat_Study/refs/heads/main/dataset/BodyFat.csv')
+df = load_dataset('BodyFat.csv')
+
+# Deviations from the prior model, evaluated and sorted once for all slider positions
+anomaly_index = AnomalyIndex(df)
 
 # Define the layout
 anomaly_detection_layout = html.Div([
@@ -57,8 +60,8 @@ anomaly_detection_layout = html.Div([
     [Input('threshold-slider', 'value')]
 )
 def update_anomaly_table(threshold):
-    # Call the anomaly detection function with the selected threshold
-    anomalies_df = find_anomalies(df, threshold=threshold)
+    # Look up the anomalies at the selected threshold in the precomputed index
+    anomalies_df = anomaly_index.query(threshold)
 
     # Round all values to 4 decimal places
     anomalies_df = anomalies_df.round(1)